@@ -8,11 +8,72 @@ Repository: https://github.com/qlickxl/iplicit_mcp_server
 """
 
 import asyncio
-from typing import Optional, Dict, Any
+import random
+import time
+from typing import Optional, Dict, Any, Tuple, FrozenSet, List, Callable
 import httpx
+import orjson
 from .session import IplicitSessionManager
 
 
+# Seconds to keep GET responses for read-only list endpoints. These lists
+# rarely change minute-to-minute; endpoints not listed here (documents,
+# single-record lookups, etc.) are always fetched fresh.
+CACHE_TTLS: Dict[str, float] = {
+    "contactaccount": 300,
+    "project": 300,
+    "product": 600,
+    "department": 600,
+    "costcentre": 600,
+    "legalentity": 3600,
+}
+
+CacheKey = Tuple[str, FrozenSet[Tuple[str, Any]]]
+
+# Most responses kept in the cache; expired and then oldest entries are evicted
+CACHE_MAX_ENTRIES = 128
+
+# Concurrent write requests issued by the bulk document operations
+MAX_CONCURRENT_WRITES = 5
+
+# Longest Retry-After (seconds) worth waiting out on a 429 before retrying;
+# longer waits are reported to the caller instead
+MAX_RETRY_AFTER = 10
+
+
+def _index_by_code(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Index items by code, keeping the first item for duplicate codes"""
+    index: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        code = item.get("code")
+        if code is not None:
+            index.setdefault(code, item)
+    return index
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given in seconds, if any"""
+    try:
+        return max(float(response.headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return None
+
+
+async def _resolved(value: Any) -> Any:
+    """Awaitable for a value that needs no lookup"""
+    return value
+
+
+def _index_by_id_and_code(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Index items by both ID and code, keeping the first item for each key"""
+    index: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        for key in (item.get("id"), item.get("code")):
+            if key is not None:
+                index.setdefault(key, item)
+    return index
+
+
 class IplicitAPIClient:
     """Handles API requests with automatic token management and error handling"""
 
@@ -22,6 +83,13 @@ class IplicitAPIClient:
         self.request_count = 0
         self.request_window_start = asyncio.get_event_loop().time()
 
+        # Response cache for CACHE_TTLS endpoints: key -> (expires_at, response)
+        self._cache: Dict[CacheKey, Tuple[float, Any]] = {}
+        # GET requests currently on the wire, shared by concurrent callers
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        # Lookup structures built from list responses: (key, name) -> (response, derived)
+        self._derived: Dict[Tuple[CacheKey, str], Tuple[Any, Any]] = {}
+
     async def make_request(
         self,
         endpoint: str,
@@ -41,7 +109,10 @@ class IplicitAPIClient:
             headers: Additional headers
 
         Returns:
-            Response data as dict
+            Response data as dict. GET responses may be shared with
+            concurrent callers of the same request, and those from endpoints
+            listed in CACHE_TTLS may be served from cache, so they must be
+            treated as read-only.
 
         Raises:
             ValueError: For validation errors (400)
@@ -50,6 +121,165 @@ class IplicitAPIClient:
             ConnectionError: For network/timeout errors
             RuntimeError: For other API errors
         """
+        if method != "GET":
+            try:
+                return await self._send_request(endpoint, method, params, body, headers)
+            finally:
+                # Writes may change cached lists for this resource
+                self.invalidate_cache(endpoint.split("/", 1)[0])
+
+        if headers:
+            return await self._send_request(endpoint, method, params, body, headers)
+
+        key = self._cache_key(endpoint, params)
+        ttl = CACHE_TTLS.get(endpoint)
+        if ttl:
+            entry = self._cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+
+        # Identical concurrent GETs share one in-flight request ("single-flight").
+        # The request runs as its own task, so cancelling any caller (including
+        # the one that started it) never cancels it for the others.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_shared(key, ttl, endpoint, params))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch_shared(
+        self,
+        key: CacheKey,
+        ttl: Optional[float],
+        endpoint: str,
+        params: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Send a GET shared through the in-flight map, caching it when ttl is set"""
+        try:
+            response = await self._send_request(endpoint, "GET", params, None, None)
+            if ttl:
+                self._store(key, time.monotonic() + ttl, response)
+            return response
+        finally:
+            del self._inflight[key]
+
+    async def get_derived(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        name: str,
+        build: Callable[[List[Dict[str, Any]]], Any]
+    ) -> Any:
+        """
+        Get a lookup structure built from a list endpoint's items
+
+        The structure is rebuilt only when the underlying response changes,
+        i.e. after its cache entry expires or is invalidated, so repeated
+        lookups against a cached list skip both the request and the scan.
+
+        Args:
+            endpoint: API list endpoint (e.g., "department")
+            params: Query parameters for the list request
+            name: Name distinguishing structures built from the same list
+            build: Builds the structure from the list items
+
+        Returns:
+            The structure returned by build
+        """
+        response = await self.make_request(endpoint, params=params)
+        key = (self._cache_key(endpoint, params), name)
+
+        entry = self._derived.get(key)
+        if entry is None or entry[0] is not response:
+            items = response if isinstance(response, list) else response.get("items", [])
+            entry = (response, build(items))
+            self._derived[key] = entry
+        return entry[1]
+
+    async def get_code_index(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a {code: item} index over a list endpoint
+
+        Args:
+            endpoint: API list endpoint (e.g., "department", "costcentre")
+            params: Query parameters for the list request
+
+        Returns:
+            Dict mapping each item code to the first item with that code
+        """
+        return await self.get_derived(endpoint, params, "code", _index_by_code)
+
+    async def get_id_code_index(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get an index over a list endpoint keyed by both item ID and code
+
+        Args:
+            endpoint: API list endpoint (e.g., "contactaccount")
+            params: Query parameters for the list request
+
+        Returns:
+            Dict mapping each item ID and code to the first matching item
+        """
+        return await self.get_derived(endpoint, params, "id_code", _index_by_id_and_code)
+
+    def invalidate_cache(self, endpoint: Optional[str] = None):
+        """
+        Drop cached responses
+
+        Args:
+            endpoint: Only drop responses for this endpoint (all if omitted)
+        """
+        if endpoint is None:
+            self._cache.clear()
+            self._derived.clear()
+            return
+
+        for key in [key for key in self._cache if key[0] == endpoint]:
+            del self._cache[key]
+        for key in [key for key in self._derived if key[0][0] == endpoint]:
+            del self._derived[key]
+
+    def _store(self, key: CacheKey, expires_at: float, response: Any):
+        """Cache a response, evicting entries beyond CACHE_MAX_ENTRIES"""
+        self._cache.pop(key, None)
+        self._cache[key] = (expires_at, response)
+        if len(self._cache) <= CACHE_MAX_ENTRIES:
+            return
+
+        now = time.monotonic()
+        evicted = {k for k, (expires, _) in self._cache.items() if expires <= now}
+        # Entries are kept in insertion order, so the first ones are the oldest
+        excess = len(self._cache) - len(evicted) - CACHE_MAX_ENTRIES
+        if excess > 0:
+            evicted.update([k for k in self._cache if k not in evicted][:excess])
+
+        for k in evicted:
+            del self._cache[k]
+        for k in [k for k in self._derived if k[0] in evicted]:
+            del self._derived[k]
+
+    @staticmethod
+    def _cache_key(endpoint: str, params: Optional[Dict[str, Any]]) -> CacheKey:
+        """Build a hashable cache key from an endpoint and its query parameters"""
+        return (endpoint, frozenset(params.items()) if params else frozenset())
+
+    async def _send_request(
+        self,
+        endpoint: str,
+        method: str,
+        params: Optional[Dict[str, Any]],
+        body: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Send a single API request, bypassing the response cache"""
         # Check rate limiting
         await self._check_rate_limit()
 
@@ -70,24 +300,35 @@ class IplicitAPIClient:
 
         # Make request with retry logic
         max_retries = 3
+        reauthenticated = False
         for attempt in range(max_retries):
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    if method == "GET":
-                        response = await client.get(url, headers=request_headers, params=params)
-                    elif method == "POST":
-                        response = await client.post(url, headers=request_headers, json=body, params=params)
-                    elif method == "PUT":
-                        response = await client.put(url, headers=request_headers, json=body, params=params)
-                    elif method == "PATCH":
-                        response = await client.patch(url, headers=request_headers, json=body, params=params)
-                    elif method == "DELETE":
-                        response = await client.delete(url, headers=request_headers, params=params)
-                    else:
-                        raise ValueError(f"Unsupported HTTP method: {method}")
-
-                    # Handle response
-                    return await self._handle_response(response)
+                response = await self._dispatch(method, url, request_headers, params, body)
+
+                # Token rejected (revoked or expired early): renew the session and retry once
+                if response.status_code == 401 and not reauthenticated:
+                    reauthenticated = True
+                    self.session_manager.invalidate_token(token)
+                    token = await self.session_manager.get_valid_token()
+                    request_headers["Authorization"] = f"Bearer {token}"
+                    response = await self._dispatch(method, url, request_headers, params, body)
+
+                if attempt < max_retries - 1:
+                    # Server error on a GET (safe to repeat): back off with jitter and retry
+                    if response.status_code >= 500 and method == "GET":
+                        await asyncio.sleep(2 ** attempt + random.random())
+                        continue
+
+                    # Rate limited: the request was not processed, so retry only when
+                    # the API asks for a short wait via Retry-After
+                    if response.status_code == 429:
+                        retry_after = _retry_after_seconds(response)
+                        if retry_after is not None and retry_after <= MAX_RETRY_AFTER:
+                            await asyncio.sleep(retry_after)
+                            continue
+
+                # Handle response
+                return await self._handle_response(response)
 
             except httpx.TimeoutException:
                 if attempt < max_retries - 1:
@@ -100,8 +341,11 @@ class IplicitAPIClient:
                         "The iplicit server may be slow or unavailable."
                     )
 
-            except httpx.NetworkError as e:
-                if attempt < max_retries - 1:
+            except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
+                # A server disconnect may come after a write was applied, so only
+                # GETs are repeated on RemoteProtocolError
+                retryable = method == "GET" or not isinstance(e, httpx.RemoteProtocolError)
+                if retryable and attempt < max_retries - 1:
                     wait_time = 2 ** attempt
                     await asyncio.sleep(wait_time)
                     continue
@@ -111,6 +355,29 @@ class IplicitAPIClient:
                         "Check your internet connection."
                     )
 
+    async def _dispatch(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        body: Optional[Dict[str, Any]]
+    ) -> httpx.Response:
+        """Send one HTTP request on the shared client"""
+        client = self.session_manager.get_http_client()
+        if method == "GET":
+            return await client.get(url, headers=headers, params=params)
+        elif method == "POST":
+            return await client.post(url, headers=headers, json=body, params=params)
+        elif method == "PUT":
+            return await client.put(url, headers=headers, json=body, params=params)
+        elif method == "PATCH":
+            return await client.patch(url, headers=headers, json=body, params=params)
+        elif method == "DELETE":
+            return await client.delete(url, headers=headers, params=params)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
     async def _handle_response(self, response: httpx.Response) -> Dict[str, Any]:
         """Handle API response and errors"""
 
@@ -120,15 +387,16 @@ class IplicitAPIClient:
             if response.status_code == 204:  # No content
                 return {}
             try:
-                return response.json()
+                # Decode straight from the response bytes
+                return orjson.loads(response.content)
             except Exception:
                 return {"raw_response": response.text}
 
         # Authentication error (401)
         if response.status_code == 401:
             raise PermissionError(
-                "Session token expired or invalid. The MCP server will automatically "
-                "refresh the token and retry your request."
+                "Session token expired or invalid, and a renewed session was also rejected. "
+                "Check the IPLICIT_API_KEY, IPLICIT_USERNAME and IPLICIT_DOMAIN settings."
             )
 
         # Permission denied (403)
@@ -216,19 +484,10 @@ class IplicitAPIClient:
             Contact account UUID or None if not found
         """
         try:
-            response = await self.make_request(
-                "contactaccount",
-                method="GET",
-                params={"maxRecordCount": 100}
-            )
-
-            items = response if isinstance(response, list) else response.get("items", [])
-
-            for contact in items:
-                if contact.get("code") == code:
-                    return contact.get("id")
-
-            return None
+            # Code index over the full contact list, built once per cached response
+            index = await self.get_code_index("contactaccount")
+            contact = index.get(code)
+            return contact.get("id") if contact else None
         except Exception:
             return None
 
@@ -281,6 +540,52 @@ class IplicitAPIClient:
         except Exception:
             return None
 
+    async def _resolve_invoice_references(
+        self,
+        data: Dict[str, Any],
+        doc_class: str
+    ) -> Tuple[Optional[str], str, str]:
+        """
+        Resolve the contact account, doc type and legal entity for a new invoice
+
+        A contact code is looked up by code, and a missing doc type or legal
+        entity falls back to the default. The lookups are independent, so
+        those that are needed run concurrently.
+
+        Args:
+            data: Invoice data (contactAccountId, docTypeId, legalEntityId)
+            doc_class: Document class (e.g., "PurchaseInvoice", "SaleInvoice")
+
+        Returns:
+            Tuple of (contact account ID, doc type ID, legal entity ID)
+
+        Raises:
+            ValueError: If the contact code or a default cannot be resolved
+        """
+        contact_id = data.get("contactAccountId")
+        doc_type_id = data.get("docTypeId")
+        legal_entity_id = data.get("legalEntityId")
+        is_code = bool(contact_id) and len(contact_id) < 36  # Not a UUID, try as code
+
+        looked_up_id, doc_type_id, legal_entity_id = await asyncio.gather(
+            self.lookup_contact_by_code(contact_id) if is_code else _resolved(contact_id),
+            _resolved(doc_type_id) if doc_type_id else self.get_default_doc_type(doc_class),
+            _resolved(legal_entity_id) if legal_entity_id else self.get_default_legal_entity(),
+        )
+
+        if is_code and not looked_up_id:
+            raise ValueError(f"Contact account with code '{contact_id}' not found")
+        if not doc_type_id:
+            raise ValueError(
+                "Could not determine default document type. Please provide docTypeId."
+            )
+        if not legal_entity_id:
+            raise ValueError(
+                "Could not determine default legal entity. Please provide legalEntityId."
+            )
+
+        return looked_up_id, doc_type_id, legal_entity_id
+
     async def create_purchase_invoice(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new purchase invoice
@@ -308,37 +613,13 @@ class IplicitAPIClient:
         # Prepare request body
         body = {}
 
-        # Handle contact account (lookup by code if needed)
-        contact_id = data.get("contactAccountId")
-        if contact_id and len(contact_id) < 36:  # Not a UUID, try as code
-            looked_up_id = await self.lookup_contact_by_code(contact_id)
-            if looked_up_id:
-                contact_id = looked_up_id
-            else:
-                raise ValueError(f"Contact account with code '{contact_id}' not found")
+        # Resolve contact account, doc type and legal entity
+        contact_id, doc_type_id, legal_entity_id = await self._resolve_invoice_references(
+            data, "PurchaseInvoice"
+        )
 
         body["contactAccountId"] = contact_id
-
-        # Handle doc type (use default if not provided)
-        doc_type_id = data.get("docTypeId")
-        if not doc_type_id:
-            doc_type_id = await self.get_default_doc_type("PurchaseInvoice")
-            if not doc_type_id:
-                raise ValueError(
-                    "Could not determine default document type. Please provide docTypeId."
-                )
-
         body["docTypeId"] = doc_type_id
-
-        # Handle legal entity (use default if not provided)
-        legal_entity_id = data.get("legalEntityId")
-        if not legal_entity_id:
-            legal_entity_id = await self.get_default_legal_entity()
-            if not legal_entity_id:
-                raise ValueError(
-                    "Could not determine default legal entity. Please provide legalEntityId."
-                )
-
         body["legalEntityId"] = legal_entity_id
 
         # Required dates and currency
@@ -401,37 +682,13 @@ class IplicitAPIClient:
         # Prepare request body
         body = {}
 
-        # Handle contact account (lookup by code if needed)
-        contact_id = data.get("contactAccountId")
-        if contact_id and len(contact_id) < 36:  # Not a UUID, try as code
-            looked_up_id = await self.lookup_contact_by_code(contact_id)
-            if looked_up_id:
-                contact_id = looked_up_id
-            else:
-                raise ValueError(f"Contact account with code '{contact_id}' not found")
+        # Resolve contact account, doc type and legal entity
+        contact_id, doc_type_id, legal_entity_id = await self._resolve_invoice_references(
+            data, "SaleInvoice"
+        )
 
         body["contactAccountId"] = contact_id
-
-        # Handle doc type (use default if not provided)
-        doc_type_id = data.get("docTypeId")
-        if not doc_type_id:
-            doc_type_id = await self.get_default_doc_type("SaleInvoice")
-            if not doc_type_id:
-                raise ValueError(
-                    "Could not determine default document type. Please provide docTypeId."
-                )
-
         body["docTypeId"] = doc_type_id
-
-        # Handle legal entity (use default if not provided)
-        legal_entity_id = data.get("legalEntityId")
-        if not legal_entity_id:
-            legal_entity_id = await self.get_default_legal_entity()
-            if not legal_entity_id:
-                raise ValueError(
-                    "Could not determine default legal entity. Please provide legalEntityId."
-                )
-
         body["legalEntityId"] = legal_entity_id
 
         # Required dates and currency
@@ -569,6 +826,41 @@ class IplicitAPIClient:
 
         return response
 
+    async def post_documents(
+        self,
+        document_ids: List[str],
+        posting_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Post several draft documents concurrently
+
+        The API has no bulk posting endpoint, so each document is posted with
+        its own request; up to MAX_CONCURRENT_WRITES run at once, making the
+        total latency close to that of the slowest few rather than the sum.
+        Repeated IDs are posted only once.
+
+        Args:
+            document_ids: Document IDs or references to post
+            posting_date: Optional posting date (ISO format YYYY-MM-DD)
+
+        Returns:
+            Each distinct document ID, in first-seen order, mapped to the posted
+            document data or the exception raised while posting that document
+        """
+        # Never post the same document twice concurrently
+        document_ids = list(dict.fromkeys(document_ids))
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_WRITES)
+
+        async def post_one(document_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.post_document(document_id, posting_date)
+
+        outcomes = await asyncio.gather(
+            *(post_one(document_id) for document_id in document_ids),
+            return_exceptions=True
+        )
+        return dict(zip(document_ids, outcomes))
+
     async def approve_document(self, document_id: str, approval_note: Optional[str] = None) -> Dict[str, Any]:
         """
         Approve a document (if approval workflow is enabled)
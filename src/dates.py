@@ -0,0 +1,18 @@
+"""
+iplicit MCP Server - Date Parsing
+
+Copyright (c) 2025 QlickXL Limited
+Licensed under MIT License - see LICENSE file for details
+
+Repository: https://github.com/qlickxl/iplicit_mcp_server
+"""
+
+import sys
+from datetime import datetime
+
+# Python 3.11+ parses a trailing "Z" natively; older versions need it spelled out
+if sys.version_info >= (3, 11):
+    parse_iso_datetime = datetime.fromisoformat
+else:
+    def parse_iso_datetime(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
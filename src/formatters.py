@@ -7,9 +7,16 @@ Licensed under MIT License - see LICENSE file for details
 Repository: https://github.com/qlickxl/iplicit_mcp_server
 """
 
-import json
+import orjson
 from typing import Any, Dict, List
-from datetime import datetime
+from .dates import parse_iso_datetime
+
+
+def _to_json(data: Any) -> str:
+    """Serialize data as indented JSON, stringifying unknown types"""
+    return orjson.dumps(
+        data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    ).decode()
 
 
 def format_response(data: Any, format_type: str, context: str = "") -> str:
@@ -25,7 +32,7 @@ def format_response(data: Any, format_type: str, context: str = "") -> str:
         Formatted string
     """
     if format_type == "json":
-        return json.dumps(data, indent=2, default=str)
+        return _to_json(data)
 
     # Markdown formatting
     if isinstance(data, dict):
@@ -74,6 +81,7 @@ def _format_documents_markdown(items: List[Dict], total_count: int) -> str:
     md += "| Doc Class | Doc No | Date | Contact | Amount | Status |\n"
     md += "|-----------|--------|------|---------|--------|--------|\n"
 
+    rows = []
     for doc in items:
         doc_class = doc.get("docClass", "N/A")
         doc_no = doc.get("docNo", doc.get("number", "N/A"))
@@ -82,7 +90,8 @@ def _format_documents_markdown(items: List[Dict], total_count: int) -> str:
         amount = _format_currency(doc.get("total", doc.get("amount")))
         status = doc.get("status", "N/A")
 
-        md += f"| {doc_class} | {doc_no} | {doc_date} | {contact} | {amount} | {status} |\n"
+        rows.append(f"| {doc_class} | {doc_no} | {doc_date} | {contact} | {amount} | {status} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -108,12 +117,14 @@ def _format_single_document_markdown(doc: Dict) -> str:
         md += "| Description | Quantity | Unit Price | Amount |\n"
         md += "|-------------|----------|------------|--------|\n"
 
+        rows = []
         for line in lines:
             desc = line.get("description", "N/A")
             qty = line.get("quantity", "")
             price = _format_currency(line.get("unitPrice", line.get("price")))
             amount = _format_currency(line.get("amount", line.get("total")))
-            md += f"| {desc} | {qty} | {price} | {amount} |\n"
+            rows.append(f"| {desc} | {qty} | {price} | {amount} |\n")
+        md += "".join(rows)
 
     return md
 
@@ -133,6 +144,7 @@ def _format_contacts_markdown(items: List[Dict], total_count: int) -> str:
     md += "| Code | Name | Type | Country | Active |\n"
     md += "|------|------|------|---------|--------|\n"
 
+    rows = []
     for contact in items:
         code = contact.get("code", "N/A")
         name = contact.get("description", contact.get("name", "N/A"))
@@ -153,7 +165,8 @@ def _format_contacts_markdown(items: List[Dict], total_count: int) -> str:
         elif "customer" in contact:
             is_active = "✓" if contact["customer"].get("isActive", True) else "✗"
 
-        md += f"| {code} | {name} | {contact_type} | {country} | {is_active} |\n"
+        rows.append(f"| {code} | {name} | {contact_type} | {country} | {is_active} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -195,13 +208,15 @@ def _format_projects_markdown(items: List[Dict], total_count: int) -> str:
     md += "| Code | Description | Start Date | Status |\n"
     md += "|------|-------------|------------|--------|\n"
 
+    rows = []
     for project in items:
         code = project.get("code", "N/A")
         desc = project.get("description", "N/A")
         start_date = _format_date(project.get("dateFrom"))
         status = "Active" if project.get("isActive", True) else "Inactive"
 
-        md += f"| {code} | {desc} | {start_date} | {status} |\n"
+        rows.append(f"| {code} | {desc} | {start_date} | {status} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -250,7 +265,7 @@ def _format_date(date_str: Any) -> str:
     try:
         if isinstance(date_str, str):
             # Try to parse ISO format
-            dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+            dt = parse_iso_datetime(date_str)
             return dt.strftime("%Y-%m-%d")
     except Exception:
         pass
@@ -285,7 +300,7 @@ def format_created_invoice(invoice: Dict, format_type: str) -> str:
         Formatted string
     """
     if format_type == "json":
-        return json.dumps(invoice, indent=2, default=str)
+        return _to_json(invoice)
 
     # Markdown formatting
     md = "## ✅ Invoice Created Successfully\n\n"
@@ -331,13 +346,15 @@ def format_created_invoice(invoice: Dict, format_type: str) -> str:
         md += "| Description | Quantity | Unit Price | Amount |\n"
         md += "|-------------|----------|------------|--------|\n"
 
+        rows = []
         for line in lines:
             desc = line.get("description", "N/A")
             qty = line.get("quantity", 1)
             price = _format_currency(line.get("netCurrencyUnitPrice", line.get("unitPrice")))
             line_net = line.get("netAmount", line.get("netCurrencyAmount"))
             amount = _format_currency(line_net)
-            md += f"| {desc} | {qty} | {price} | {amount} |\n"
+            rows.append(f"| {desc} | {qty} | {price} | {amount} |\n")
+        md += "".join(rows)
 
     # Next steps
     md += "\n### Next Steps\n\n"
@@ -363,7 +380,7 @@ def format_updated_document(document: Dict, format_type: str) -> str:
         Formatted string
     """
     if format_type == "json":
-        return json.dumps(document, indent=2, default=str)
+        return _to_json(document)
 
     # Markdown formatting
     md = "## ✅ Document Updated Successfully\n\n"
@@ -417,13 +434,15 @@ def format_updated_document(document: Dict, format_type: str) -> str:
         md += "| Description | Quantity | Unit Price | Amount |\n"
         md += "|-------------|----------|------------|--------|\n"
 
+        rows = []
         for line in lines:
             desc = line.get("description", "N/A")
             qty = line.get("quantity", 1)
             price = _format_currency(line.get("netCurrencyUnitPrice", line.get("unitPrice")))
             line_net = line.get("netAmount", line.get("netCurrencyAmount"))
             amount = _format_currency(line_net)
-            md += f"| {desc} | {qty} | {price} | {amount} |\n"
+            rows.append(f"| {desc} | {qty} | {price} | {amount} |\n")
+        md += "".join(rows)
 
     return md
 
@@ -446,6 +465,7 @@ def format_purchase_orders(items: List[Dict], total_count: int) -> str:
     md += "| PO Number | Date | Supplier | Amount | Status |\n"
     md += "|-----------|------|----------|--------|--------|\n"
 
+    rows = []
     for order in items:
         po_no = order.get("docNo", order.get("number", "N/A"))
         po_date = _format_date(order.get("docDate", order.get("date")))
@@ -453,7 +473,8 @@ def format_purchase_orders(items: List[Dict], total_count: int) -> str:
         amount = _format_currency(order.get("grossAmount", order.get("total")))
         status = order.get("status", "N/A")
 
-        md += f"| {po_no} | {po_date} | {supplier} | {amount} | {status} |\n"
+        rows.append(f"| {po_no} | {po_date} | {supplier} | {amount} | {status} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -495,13 +516,15 @@ def format_single_purchase_order(order: Dict) -> str:
         md += "| Description | Quantity | Unit Price | Amount |\n"
         md += "|-------------|----------|------------|--------|\n"
 
+        rows = []
         for line in lines:
             desc = line.get("description", "N/A")
             qty = line.get("quantity", "")
             price = _format_currency(line.get("netCurrencyUnitPrice", line.get("unitPrice")))
             line_amount = line.get("netAmount", line.get("netCurrencyAmount"))
             amount = _format_currency(line_amount)
-            md += f"| {desc} | {qty} | {price} | {amount} |\n"
+            rows.append(f"| {desc} | {qty} | {price} | {amount} |\n")
+        md += "".join(rows)
 
     return md
 
@@ -521,6 +544,7 @@ def format_sale_orders(items: List[Dict], total_count: int) -> str:
     md += "| SO Number | Date | Customer | Amount | Status |\n"
     md += "|-----------|------|----------|--------|--------|\n"
 
+    rows = []
     for order in items:
         so_no = order.get("docNo", order.get("number", "N/A"))
         so_date = _format_date(order.get("docDate", order.get("date")))
@@ -528,7 +552,8 @@ def format_sale_orders(items: List[Dict], total_count: int) -> str:
         amount = _format_currency(order.get("grossAmount", order.get("total")))
         status = order.get("status", "N/A")
 
-        md += f"| {so_no} | {so_date} | {customer} | {amount} | {status} |\n"
+        rows.append(f"| {so_no} | {so_date} | {customer} | {amount} | {status} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -570,13 +595,15 @@ def format_single_sale_order(order: Dict) -> str:
         md += "| Description | Quantity | Unit Price | Amount |\n"
         md += "|-------------|----------|------------|--------|\n"
 
+        rows = []
         for line in lines:
             desc = line.get("description", "N/A")
             qty = line.get("quantity", "")
             price = _format_currency(line.get("netCurrencyUnitPrice", line.get("unitPrice")))
             line_amount = line.get("netAmount", line.get("netCurrencyAmount"))
             amount = _format_currency(line_amount)
-            md += f"| {desc} | {qty} | {price} | {amount} |\n"
+            rows.append(f"| {desc} | {qty} | {price} | {amount} |\n")
+        md += "".join(rows)
 
     return md
 
@@ -596,6 +623,7 @@ def format_payments(items: List[Dict], total_count: int) -> str:
     md += "| Date | Contact | Amount | Type | Reference |\n"
     md += "|------|---------|--------|------|----------|\n"
 
+    rows = []
     for payment in items:
         pay_date = _format_date(payment.get("paymentDate", payment.get("date")))
         contact = payment.get("contactAccountDescription", payment.get("contact", "N/A"))
@@ -603,7 +631,8 @@ def format_payments(items: List[Dict], total_count: int) -> str:
         pay_type = payment.get("paymentType", payment.get("type", "N/A"))
         reference = payment.get("reference", payment.get("docNo", "N/A"))
 
-        md += f"| {pay_date} | {contact} | {amount} | {pay_type} | {reference} |\n"
+        rows.append(f"| {pay_date} | {contact} | {amount} | {pay_type} | {reference} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -623,13 +652,15 @@ def format_products(items: List[Dict], total_count: int) -> str:
     md += "| Code | Description | Price | Active |\n"
     md += "|------|-------------|-------|--------|\n"
 
+    rows = []
     for product in items:
         code = product.get("code", "N/A")
         desc = product.get("description", product.get("name", "N/A"))
         price = _format_currency(product.get("salePrice", product.get("price")))
         is_active = "✓" if product.get("isActive", True) else "✗"
 
-        md += f"| {code} | {desc} | {price} | {is_active} |\n"
+        rows.append(f"| {code} | {desc} | {price} | {is_active} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -690,11 +721,13 @@ def format_departments(items: List[Dict], total_count: int) -> str:
     md += "| Code | Name | Active |\n"
     md += "|------|------|--------|\n"
 
+    rows = []
     for dept in items:
         code = dept.get("code", "N/A")
         name = dept.get("description", dept.get("name", "N/A"))
         active = "Yes" if dept.get("active", True) else "No"
-        md += f"| {code} | {name} | {active} |\n"
+        rows.append(f"| {code} | {name} | {active} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -736,11 +769,13 @@ def format_cost_centres(items: List[Dict], total_count: int) -> str:
     md += "| Code | Name | Active |\n"
     md += "|------|------|--------|\n"
 
+    rows = []
     for cc in items:
         code = cc.get("code", "N/A")
         name = cc.get("description", cc.get("name", "N/A"))
         active = "Yes" if cc.get("active", True) else "No"
-        md += f"| {code} | {name} | {active} |\n"
+        rows.append(f"| {code} | {name} | {active} |\n")
+    md += "".join(rows)
 
     return md
 
@@ -791,6 +826,42 @@ def format_posted_document(document: Dict) -> str:
     return md
 
 
+def format_posted_documents(results: List[Dict]) -> str:
+    """Format the results of posting several documents"""
+    posted = [result for result in results if "document" in result]
+    failed = [result for result in results if "error" in result]
+    skipped = [result for result in results if "skipped" in result]
+
+    md = f"## Documents Posted\n\n"
+    md += f"**Posted:** {len(posted)} | **Failed:** {len(failed)}"
+    if skipped:
+        md += f" | **Skipped:** {len(skipped)}"
+    md += "\n\n"
+
+    # Create table
+    md += "| Document | Status | Amount | Result |\n"
+    md += "|----------|--------|--------|--------|\n"
+
+    rows = []
+    for result in results:
+        if "document" in result:
+            document = result["document"]
+            doc_no = document.get("docNo", document.get("number", result["documentId"]))
+            status = document.get("status", "N/A")
+            amount = _format_currency(document.get("grossAmount", document.get("total")))
+            rows.append(f"| {doc_no} | {status} | {amount} | ✅ Posted |\n")
+        elif "skipped" in result:
+            rows.append(f"| {result['documentId']} | N/A | N/A | ⏭️ {result['skipped']} |\n")
+        else:
+            rows.append(f"| {result['documentId']} | N/A | N/A | ❌ {result['error']} |\n")
+    md += "".join(rows)
+
+    if posted:
+        md += f"\n✅ {len(posted)} document(s) have been posted to the ledger.\n"
+
+    return md
+
+
 def format_approved_document(document: Dict) -> str:
     """Format an approved document result"""
     md = f"## Document Approved Successfully\n\n"
@@ -846,6 +917,7 @@ def format_batch_payments(items: List[Dict], total_count: int) -> str:
     md += "| Batch No | Date | Total Amount | Item Count | Status |\n"
     md += "|----------|------|--------------|------------|--------|\n"
 
+    rows = []
     for batch in items:
         batch_no = batch.get("batchNo", batch.get("number", "N/A"))
         batch_date = _format_date(batch.get("batchDate", batch.get("date")))
@@ -853,6 +925,7 @@ def format_batch_payments(items: List[Dict], total_count: int) -> str:
         item_count = batch.get("itemCount", batch.get("lineCount", "N/A"))
         status = batch.get("status", "N/A")
 
-        md += f"| {batch_no} | {batch_date} | {total_amount} | {item_count} | {status} |\n"
+        rows.append(f"| {batch_no} | {batch_date} | {total_amount} | {item_count} | {status} |\n")
+    md += "".join(rows)
 
     return md
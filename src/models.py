@@ -8,11 +8,17 @@ Repository: https://github.com/qlickxl/iplicit_mcp_server
 """
 
 from typing import Optional, Literal, List
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import date
 
 
-class SearchDocumentsInput(BaseModel):
+class ToolInput(BaseModel):
+    """Base class for tool inputs: immutable once validated, unknown keys ignored"""
+
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+
+class SearchDocumentsInput(ToolInput):
     """Input schema for searching documents"""
 
     doc_class: Optional[str] = Field(
@@ -47,7 +53,7 @@ class SearchDocumentsInput(BaseModel):
     )
 
 
-class GetDocumentInput(BaseModel):
+class GetDocumentInput(ToolInput):
     """Input schema for retrieving a specific document"""
 
     document_id: str = Field(
@@ -63,7 +69,7 @@ class GetDocumentInput(BaseModel):
     )
 
 
-class SearchContactAccountsInput(BaseModel):
+class SearchContactAccountsInput(ToolInput):
     """Input schema for searching contact accounts"""
 
     account_type: Optional[Literal["customer", "supplier", "all"]] = Field(
@@ -90,7 +96,7 @@ class SearchContactAccountsInput(BaseModel):
     )
 
 
-class GetContactAccountInput(BaseModel):
+class GetContactAccountInput(ToolInput):
     """Input schema for retrieving a specific contact account"""
 
     account_id: str = Field(
@@ -110,7 +116,7 @@ class GetContactAccountInput(BaseModel):
     )
 
 
-class SearchProjectsInput(BaseModel):
+class SearchProjectsInput(ToolInput):
     """Input schema for searching projects"""
 
     search_term: Optional[str] = Field(
@@ -164,17 +170,20 @@ class InvoiceLineItem(BaseModel):
     )
 
 
-class CreatePurchaseInvoiceInput(BaseModel):
+class CreatePurchaseInvoiceInput(ToolInput):
     """Input schema for creating a purchase invoice"""
 
     # Required fields
     contact_account_id: str = Field(
+        serialization_alias="contactAccountId",
         description="Supplier contact account ID (UUID) or code - will lookup if code provided"
     )
     doc_date: str = Field(
+        serialization_alias="docDate",
         description="Document date (ISO format: YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"
     )
     due_date: str = Field(
+        serialization_alias="dueDate",
         description="Payment due date (ISO format: YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"
     )
 
@@ -185,10 +194,12 @@ class CreatePurchaseInvoiceInput(BaseModel):
     )
     doc_type_id: Optional[str] = Field(
         None,
+        serialization_alias="docTypeId",
         description="Document type UUID (optional, will use default purchase invoice type if not provided)"
     )
     legal_entity_id: Optional[str] = Field(
         None,
+        serialization_alias="legalEntityId",
         description="Legal entity UUID (optional, will use default if not provided)"
     )
 
@@ -199,14 +210,17 @@ class CreatePurchaseInvoiceInput(BaseModel):
     )
     their_doc_no: Optional[str] = Field(
         None,
+        serialization_alias="theirDocNo",
         description="Supplier's invoice number/reference"
     )
     payment_terms_id: Optional[str] = Field(
         None,
+        serialization_alias="paymentTermsId",
         description="Payment terms UUID (optional)"
     )
     project_id: Optional[str] = Field(
         None,
+        serialization_alias="projectId",
         description="Project UUID for project-based invoices (optional)"
     )
 
@@ -232,17 +246,20 @@ class CreatePurchaseInvoiceInput(BaseModel):
         return v
 
 
-class CreateSaleInvoiceInput(BaseModel):
+class CreateSaleInvoiceInput(ToolInput):
     """Input schema for creating a sales invoice"""
 
     # Required fields
     contact_account_id: str = Field(
+        serialization_alias="contactAccountId",
         description="Customer contact account ID (UUID) or code - will lookup if code provided"
     )
     doc_date: str = Field(
+        serialization_alias="docDate",
         description="Document date (ISO format: YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"
     )
     due_date: str = Field(
+        serialization_alias="dueDate",
         description="Payment due date (ISO format: YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)"
     )
 
@@ -253,10 +270,12 @@ class CreateSaleInvoiceInput(BaseModel):
     )
     doc_type_id: Optional[str] = Field(
         None,
+        serialization_alias="docTypeId",
         description="Document type UUID (optional, will use default sales invoice type if not provided)"
     )
     legal_entity_id: Optional[str] = Field(
         None,
+        serialization_alias="legalEntityId",
         description="Legal entity UUID (optional, will use default if not provided)"
     )
 
@@ -271,10 +290,12 @@ class CreateSaleInvoiceInput(BaseModel):
     )
     payment_terms_id: Optional[str] = Field(
         None,
+        serialization_alias="paymentTermsId",
         description="Payment terms UUID (optional)"
     )
     project_id: Optional[str] = Field(
         None,
+        serialization_alias="projectId",
         description="Project UUID for project-based invoices (optional)"
     )
 
@@ -300,7 +321,7 @@ class CreateSaleInvoiceInput(BaseModel):
         return v
 
 
-class UpdateDocumentInput(BaseModel):
+class UpdateDocumentInput(ToolInput):
     """Input schema for updating an existing document"""
 
     # Required field
@@ -315,6 +336,7 @@ class UpdateDocumentInput(BaseModel):
     )
     their_doc_no: Optional[str] = Field(
         None,
+        serialization_alias="theirDocNo",
         description="Update supplier/customer reference number"
     )
     reference: Optional[str] = Field(
@@ -323,14 +345,17 @@ class UpdateDocumentInput(BaseModel):
     )
     doc_date: Optional[str] = Field(
         None,
+        serialization_alias="docDate",
         description="Update document date (ISO format: YYYY-MM-DD)"
     )
     due_date: Optional[str] = Field(
         None,
+        serialization_alias="dueDate",
         description="Update due date (ISO format: YYYY-MM-DD)"
     )
     contact_account_id: Optional[str] = Field(
         None,
+        serialization_alias="contactAccountId",
         description="Change contact account (UUID or code)"
     )
     lines: Optional[List[InvoiceLineItem]] = Field(
@@ -348,7 +373,7 @@ class UpdateDocumentInput(BaseModel):
 # ===== PHASE 3: ADDITIONAL READ OPERATIONS =====
 
 
-class SearchPurchaseOrdersInput(BaseModel):
+class SearchPurchaseOrdersInput(ToolInput):
     """Input schema for searching purchase orders"""
 
     status: Optional[str] = Field(
@@ -383,7 +408,7 @@ class SearchPurchaseOrdersInput(BaseModel):
     )
 
 
-class GetPurchaseOrderInput(BaseModel):
+class GetPurchaseOrderInput(ToolInput):
     """Input schema for retrieving a specific purchase order"""
 
     order_id: str = Field(
@@ -399,7 +424,7 @@ class GetPurchaseOrderInput(BaseModel):
     )
 
 
-class SearchSaleOrdersInput(BaseModel):
+class SearchSaleOrdersInput(ToolInput):
     """Input schema for searching sales orders"""
 
     status: Optional[str] = Field(
@@ -434,7 +459,7 @@ class SearchSaleOrdersInput(BaseModel):
     )
 
 
-class GetSaleOrderInput(BaseModel):
+class GetSaleOrderInput(ToolInput):
     """Input schema for retrieving a specific sales order"""
 
     order_id: str = Field(
@@ -450,7 +475,7 @@ class GetSaleOrderInput(BaseModel):
     )
 
 
-class SearchPaymentsInput(BaseModel):
+class SearchPaymentsInput(ToolInput):
     """Input schema for searching payments"""
 
     payment_type: Optional[Literal["received", "made", "all"]] = Field(
@@ -491,7 +516,7 @@ class SearchPaymentsInput(BaseModel):
     )
 
 
-class SearchProductsInput(BaseModel):
+class SearchProductsInput(ToolInput):
     """Input schema for searching products"""
 
     search_term: Optional[str] = Field(
@@ -518,7 +543,7 @@ class SearchProductsInput(BaseModel):
     )
 
 
-class GetProductInput(BaseModel):
+class GetProductInput(ToolInput):
     """Input schema for retrieving a specific product"""
 
     product_id: str = Field(
@@ -541,7 +566,7 @@ class GetProductInput(BaseModel):
 # ===== PHASE 4: ORGANIZATIONAL HIERARCHY & WORKFLOWS =====
 
 
-class SearchDepartmentsInput(BaseModel):
+class SearchDepartmentsInput(ToolInput):
     """Input schema for searching departments"""
 
     search_term: Optional[str] = Field(
@@ -564,7 +589,7 @@ class SearchDepartmentsInput(BaseModel):
     )
 
 
-class GetDepartmentInput(BaseModel):
+class GetDepartmentInput(ToolInput):
     """Input schema for retrieving a specific department"""
 
     department_id: str = Field(
@@ -576,7 +601,7 @@ class GetDepartmentInput(BaseModel):
     )
 
 
-class SearchCostCentresInput(BaseModel):
+class SearchCostCentresInput(ToolInput):
     """Input schema for searching cost centres"""
 
     search_term: Optional[str] = Field(
@@ -599,7 +624,7 @@ class SearchCostCentresInput(BaseModel):
     )
 
 
-class GetCostCentreInput(BaseModel):
+class GetCostCentreInput(ToolInput):
     """Input schema for retrieving a specific cost centre"""
 
     cost_centre_id: str = Field(
@@ -611,7 +636,7 @@ class GetCostCentreInput(BaseModel):
     )
 
 
-class PostDocumentInput(BaseModel):
+class PostDocumentInput(ToolInput):
     """Input schema for posting a document"""
 
     document_id: str = Field(
@@ -627,7 +652,25 @@ class PostDocumentInput(BaseModel):
     )
 
 
-class ApproveDocumentInput(BaseModel):
+class PostDocumentsInput(ToolInput):
+    """Input schema for posting several documents at once"""
+
+    document_ids: List[str] = Field(
+        min_length=1,
+        max_length=50,
+        description="Document IDs or references to post"
+    )
+    posting_date: Optional[str] = Field(
+        None,
+        description="Posting date (ISO format: YYYY-MM-DD) - uses each document's date if not provided"
+    )
+    format: Literal["json", "markdown"] = Field(
+        default="markdown",
+        description="Response format"
+    )
+
+
+class ApproveDocumentInput(ToolInput):
     """Input schema for approving a document"""
 
     document_id: str = Field(
@@ -643,7 +686,7 @@ class ApproveDocumentInput(BaseModel):
     )
 
 
-class ReverseDocumentInput(BaseModel):
+class ReverseDocumentInput(ToolInput):
     """Input schema for reversing a posted document"""
 
     document_id: str = Field(
@@ -662,7 +705,7 @@ class ReverseDocumentInput(BaseModel):
     )
 
 
-class SearchBatchPaymentsInput(BaseModel):
+class SearchBatchPaymentsInput(ToolInput):
     """Input schema for searching batch payments"""
 
     from_date: Optional[str] = Field(
@@ -687,3 +730,12 @@ class SearchBatchPaymentsInput(BaseModel):
         default="markdown",
         description="Response format"
     )
+
+
+class DiscoverToolsInput(ToolInput):
+    """Input schema for discovering and loading deferred tools"""
+
+    load: Optional[List[str]] = Field(
+        None,
+        description="Names of deferred tools to load (e.g., ['create_purchase_invoice'])"
+    )
@@ -8,9 +8,15 @@ Repository: https://github.com/qlickxl/iplicit_mcp_server
 """
 
 import os
-from typing import Any
+import re
+import asyncio
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Callable, List, Optional
 from dotenv import load_dotenv
-from mcp.server import Server
+from pydantic import TypeAdapter
+from mcp.server import NotificationOptions, Server
 from mcp.types import Tool, TextContent
 
 from .session import IplicitSessionManager
@@ -33,6 +39,7 @@ from .formatters import (
     format_cost_centres,
     format_single_cost_centre,
     format_posted_document,
+    format_posted_documents,
     format_approved_document,
     format_reversed_document,
     format_batch_payments,
@@ -44,6 +51,7 @@ from .models import (
     GetContactAccountInput,
     SearchProjectsInput,
     # Phase 2: Write operations
+    InvoiceLineItem,
     CreatePurchaseInvoiceInput,
     CreateSaleInvoiceInput,
     UpdateDocumentInput,
@@ -61,36 +69,414 @@ from .models import (
     SearchCostCentresInput,
     GetCostCentreInput,
     PostDocumentInput,
+    PostDocumentsInput,
     ApproveDocumentInput,
     ReverseDocumentInput,
     SearchBatchPaymentsInput,
+    DiscoverToolsInput,
 )
 
-# Load environment variables
+# Load environment variables (values already set in the environment win)
 load_dotenv()
 
 # Initialize server
 app = Server("iplicit-mcp-server")
 
+# Lazy tool mode: only core tools are listed until others are loaded on demand
+LAZY_TOOLS = os.getenv("IPLICIT_LAZY", "").lower() in ("1", "true", "yes")
+CORE_TOOL_NAMES = frozenset({"search_documents", "get_document", "search_contact_accounts"})
+
+# Serializes a whole list of invoice line items in a single pydantic-core pass
+line_items_adapter = TypeAdapter(List[InvoiceLineItem])
+
+# Validators for each tool input model, compiled once at import
+INPUT_ADAPTERS = {
+    model: TypeAdapter(model)
+    for model in (
+        SearchDocumentsInput,
+        GetDocumentInput,
+        SearchContactAccountsInput,
+        GetContactAccountInput,
+        SearchProjectsInput,
+        CreatePurchaseInvoiceInput,
+        CreateSaleInvoiceInput,
+        UpdateDocumentInput,
+        SearchPurchaseOrdersInput,
+        GetPurchaseOrderInput,
+        SearchSaleOrdersInput,
+        GetSaleOrderInput,
+        SearchPaymentsInput,
+        SearchProductsInput,
+        GetProductInput,
+        SearchDepartmentsInput,
+        GetDepartmentInput,
+        SearchCostCentresInput,
+        GetCostCentreInput,
+        PostDocumentInput,
+        PostDocumentsInput,
+        ApproveDocumentInput,
+        ReverseDocumentInput,
+        SearchBatchPaymentsInput,
+        DiscoverToolsInput,
+    )
+}
+
+# Input fields that are never forwarded to the API when dumping write inputs
+INPUT_ONLY_FIELDS = frozenset({"format", "lines"})
+
+# Upper bound on maxRecordCount for single-request searches
+MAX_RECORD_COUNT = 500
+
+# Query for the product, department and cost centre catalogs. Searches and code
+# lookups all read this one cached list so its search keys are built only once.
+CATALOG_PARAMS = {"maxRecordCount": MAX_RECORD_COUNT}
+
+# Also send search filters to the API as query parameters (off by default; the
+# filters are always re-applied locally for API versions that ignore them)
+SERVER_FILTERS = os.getenv("IPLICIT_SERVER_FILTERS", "").lower() in ("1", "true", "yes")
+
+# Search results remembered per catalog response (least recently used dropped first)
+SEARCH_MEMO_SIZE = 256
+
+
+# Record IDs are UUIDs; anything else is treated as a code
+UUID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+
+
+def _search_pattern(term: Optional[str]) -> Optional[re.Pattern]:
+    """Compile a search term into a case-insensitive literal matcher"""
+    return re.compile(re.escape(term), re.IGNORECASE) if term else None
+
+
+def _build_search_index(items: list[dict]) -> tuple[list[tuple[str, str, dict]], str, list[int]]:
+    """
+    Index catalog items for case-insensitive substring search
+
+    Returns each item's (code, description, item) search keys, lowercased,
+    plus every code and description joined into one NUL-separated text with
+    the offset where each item starts, so a term can be located with
+    str.find over the whole catalog instead of a per-item loop.
+    """
+    keys = [
+        (
+            (item.get("code") or "").lower(),
+            (item.get("description") or item.get("name") or "").lower(),
+            item,
+        )
+        for item in items
+    ]
+
+    starts = []
+    offset = 0
+    for code, description, _ in keys:
+        starts.append(offset)
+        offset += len(code) + len(description) + 2
+    text = "\0".join(part for code, description, _ in keys for part in (code, description))
+
+    return keys, text, starts
+
+
+def _find_in_search_text(text: str, starts: list[int], needle: str) -> list[int]:
+    """Positions of the items whose joined search text contains needle"""
+    found = []
+    last = len(starts) - 1
+    position = text.find(needle)
+    while position != -1:
+        index = bisect_right(starts, position) - 1
+        found.append(index)
+        if index == last:
+            break
+        # Resume at the next item so each item is reported once
+        position = text.find(needle, starts[index + 1])
+    return found
+
+
+def _product_filter(active_only: bool, product_type: Optional[str]) -> Optional[Callable[[dict], bool]]:
+    """Per-item product filter for active_only and product_type, or None if neither is set"""
+    if active_only and product_type:
+        return lambda item: item.get("isActive", True) and item.get("productType") == product_type
+    if active_only:
+        return lambda item: item.get("isActive", True)
+    if product_type:
+        return lambda item: item.get("productType") == product_type
+    return None
+
+
+def _active_filter(item: dict) -> bool:
+    """Per-item filter for active departments and cost centres"""
+    return item.get("active", True)
+
+
+def _api_filters(
+    search_term: Optional[str],
+    active_only: bool,
+    product_type: Optional[str] = None,
+) -> dict:
+    """Query parameters for the search filters the API can apply"""
+    params = {}
+    if search_term:
+        params["searchTerm"] = search_term
+    if active_only:
+        params["isActive"] = "true"
+    if product_type:
+        params["productType"] = product_type
+    return params
+
+
+def _contact_name(item: dict, fallback: str) -> str:
+    """Contact name for order and payment filters, falling back per item"""
+    return item.get("contactAccountDescription") or item.get(fallback) or ""
+
+
+def _contact_filter(pattern: Optional[re.Pattern], fallback: str) -> Optional[Callable]:
+    """Build a run_list_search filter matching the contact name against pattern"""
+    if not pattern:
+        return None
+    search = pattern.search
+    return lambda item: search(_contact_name(item, fallback))
+
+
 # Initialize clients (lazy initialization)
 session_manager: IplicitSessionManager = None
 api_client: IplicitAPIClient = None
 
 
-def get_api_client() -> IplicitAPIClient:
-    """Get or create API client"""
-    global session_manager, api_client
+# Guards one-time client construction against concurrent first tool calls
+_client_lock = asyncio.Lock()
 
-    if api_client is None:
+
+def get_session_manager() -> IplicitSessionManager:
+    """Get or create the session manager"""
+    global session_manager
+
+    if session_manager is None:
         session_manager = IplicitSessionManager()
-        api_client = IplicitAPIClient(session_manager)
+
+    return session_manager
+
+
+async def get_api_client() -> IplicitAPIClient:
+    """Get or create API client"""
+    global api_client
+
+    if api_client is not None:
+        return api_client
+
+    async with _client_lock:
+        if api_client is None:
+            api_client = IplicitAPIClient(get_session_manager())
 
     return api_client
 
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available tools"""
+# Small, frequently used reference lists warmed in the background at startup.
+# Params mirror the handlers' default queries so those calls hit the cache.
+PREFETCH_REQUESTS = (
+    ("contactaccount", None),
+    ("project", None),
+    ("product", CATALOG_PARAMS),
+    ("department", CATALOG_PARAMS),
+    ("costcentre", CATALOG_PARAMS),
+    # Default legal entity for new invoices
+    ("legalentity", {"maxRecordCount": 1}),
+)
+
+
+async def prefetch_reference_data():
+    """Warm the response cache for common lookups (failures are ignored)"""
+    try:
+        client = await get_api_client()
+    except Exception:
+        # Missing credentials surface on the first tool call instead
+        return
+
+    await asyncio.gather(
+        *(client.make_request(endpoint, params=params) for endpoint, params in PREFETCH_REQUESTS),
+        # Contact indexes for get_contact_account and invoice contact codes;
+        # they share the in-flight contact list requests above
+        client.get_id_code_index("contactaccount"),
+        client.get_code_index("contactaccount"),
+        return_exceptions=True,
+    )
+
+
+# Delay before retrying a failed background session refresh
+SESSION_RETRY_DELAY = 60
+
+
+async def keep_session_fresh():
+    """Create the session at startup and renew it before expiry, so tool calls never wait on it"""
+    while True:
+        try:
+            client = await get_api_client()
+        except ValueError:
+            # Missing credentials surface on the first tool call instead
+            return
+
+        try:
+            await client.session_manager.get_valid_token()
+            delay = max(client.session_manager.seconds_until_refresh(), SESSION_RETRY_DELAY)
+        except Exception:
+            delay = SESSION_RETRY_DELAY
+
+        await asyncio.sleep(delay)
+
+
+async def search_catalog(
+    client: IplicitAPIClient,
+    endpoint: str,
+    search_lower: Optional[str],
+    filters: tuple,
+    predicate: Optional[Callable[[dict], bool]],
+    api_filters: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Find all catalog items matching a lowercased search term and filters
+
+    Results are remembered per catalog response, keyed by the search term and
+    the filter values, so repeated queries skip the scan. A query that extends
+    a remembered one ("wid" -> "widget") only rescans that query's matches.
+    Results are dropped with the catalog when it expires or is invalidated.
+
+    Args:
+        client: API client
+        endpoint: Catalog endpoint (e.g., "product")
+        search_lower: Lowercased search term (None for no search filter)
+        filters: Hashable values of the filters applied by predicate
+        predicate: Extra per-item filter (None when no filter is active)
+        api_filters: Equivalent API query parameters, sent when SERVER_FILTERS is set
+
+    Returns:
+        Matching items in catalog order (shared, read-only)
+    """
+    params = dict(CATALOG_PARAMS, **api_filters) if SERVER_FILTERS and api_filters else CATALOG_PARAMS
+    memo = await client.get_derived(endpoint, params, "results", lambda items: OrderedDict())
+
+    # Memo entries are (matching search keys, matching items)
+    key = (search_lower, filters)
+    entry = memo.get(key)
+    if entry is not None:
+        memo.move_to_end(key)
+        return entry[1]
+
+    if search_lower:
+        # Anything matching the term also matches each of its prefixes, so the
+        # longest remembered prefix (or the unsearched list) bounds the scan
+        candidates = None
+        for end in range(len(search_lower) - 1, 0, -1):
+            prefix_entry = memo.get((search_lower[:end], filters))
+            if prefix_entry is not None:
+                candidates = prefix_entry[0]
+                break
+        if candidates is None:
+            unsearched = memo.get((None, filters))
+            if unsearched is not None:
+                candidates = unsearched[0]
+
+        if candidates is not None:
+            matched = [
+                keys for keys in candidates
+                if search_lower in keys[0] or search_lower in keys[1]
+            ]
+        else:
+            search_keys, text, starts = await client.get_derived(
+                endpoint, params, "search", _build_search_index
+            )
+            if "\0" in search_lower:
+                hits = (
+                    keys for keys in search_keys
+                    if search_lower in keys[0] or search_lower in keys[1]
+                )
+            else:
+                hits = (search_keys[index] for index in _find_in_search_text(text, starts, search_lower))
+            matched = [keys for keys in hits if predicate(keys[2])] if predicate else list(hits)
+    else:
+        search_keys, _, _ = await client.get_derived(endpoint, params, "search", _build_search_index)
+        matched = [keys for keys in search_keys if predicate(keys[2])] if predicate else search_keys
+
+    matches = [keys[2] for keys in matched]
+    memo[key] = (matched, matches)
+    if len(memo) > SEARCH_MEMO_SIZE:
+        memo.popitem(last=False)
+    return matches
+
+
+async def run_list_search(
+    client: IplicitAPIClient,
+    endpoint: str,
+    params: dict,
+    input_data: Any,
+    formatter: Callable[[list, int], str],
+    item_filter: Optional[Callable[[dict], Any]] = None,
+) -> str:
+    """
+    Run a single-request search tool and format the first `limit` results
+
+    Args:
+        client: API client
+        endpoint: API list endpoint (e.g., "purchaseorder")
+        params: Query parameters (maxRecordCount is added from the limit)
+        input_data: Validated search input (limit, format)
+        formatter: Markdown formatter for the results
+        item_filter: Client-side per-item filter, if any
+
+    Returns:
+        Formatted response
+    """
+    limit = input_data.limit
+    params["maxRecordCount"] = min(limit, MAX_RECORD_COUNT)
+
+    response = await client.make_request(endpoint, params=params)
+    items = response if isinstance(response, list) else response.get("items", [])
+
+    if item_filter:
+        items = [item for item in items if item_filter(item)]
+    items = items[:limit]
+
+    if input_data.format == "json":
+        return format_response({"items": items, "totalCount": len(items)}, "json")
+    else:
+        return formatter(items, len(items))
+
+
+async def run_catalog_search(
+    client: IplicitAPIClient,
+    endpoint: str,
+    input_data: Any,
+    filters: tuple,
+    predicate: Optional[Callable[[dict], bool]],
+    api_filters: dict,
+    formatter: Callable[[list, int], str],
+) -> str:
+    """
+    Run a catalog search tool and format the first `limit` matches
+
+    Args:
+        client: API client
+        endpoint: Catalog endpoint (e.g., "product")
+        input_data: Validated search input (search_term, limit, format)
+        filters: Hashable values of the filters applied by predicate
+        predicate: Extra per-item filter (None when no filter is active)
+        api_filters: Equivalent API query parameters
+        formatter: Markdown formatter for the matching items
+
+    Returns:
+        Formatted response
+    """
+    search_lower = input_data.search_term.lower() if input_data.search_term else None
+    matches = await search_catalog(client, endpoint, search_lower, filters, predicate, api_filters)
+    items = matches[:input_data.limit]
+
+    if input_data.format == "json":
+        return format_response({"items": items, "totalCount": len(items)}, "json")
+    else:
+        return formatter(items, len(items))
+
+
+def _build_tools() -> list[Tool]:
+    """Build the static tool definitions, including their input schemas"""
     return [
         Tool(
             name="search_documents",
@@ -269,6 +655,15 @@ async def list_tools() -> list[Tool]:
             ),
             inputSchema=PostDocumentInput.model_json_schema(),
         ),
+        Tool(
+            name="post_documents",
+            description=(
+                "Post several draft documents at once (up to 50). Same critical operation as "
+                "post_document, applied to each document; documents are posted concurrently and "
+                "failures are reported per document without stopping the others. Use with caution."
+            ),
+            inputSchema=PostDocumentsInput.model_json_schema(),
+        ),
         Tool(
             name="approve_document",
             description=(
@@ -297,66 +692,46 @@ async def list_tools() -> list[Tool]:
     ]
 
 
+# Tool definitions never change, so schemas are generated once at import
+TOOLS: list[Tool] = _build_tools()
+TOOLS_BY_NAME = {tool.name: tool for tool in TOOLS}
+
+# Meta-tool exposed in lazy mode to list and load deferred tools
+DISCOVER_TOOL = Tool(
+    name="discover_iplicit_tools",
+    description=(
+        "List the additional iplicit tools that are not loaded yet, or load them by name. "
+        "Loaded tools become available in the tool list immediately."
+    ),
+    inputSchema=DiscoverToolsInput.model_json_schema(),
+)
+
+# Deferred tools loaded so far in lazy mode
+loaded_tools: set[str] = set()
+
+
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available tools"""
+    if not LAZY_TOOLS:
+        return TOOLS
+    return [DISCOVER_TOOL] + [
+        tool for tool in TOOLS
+        if tool.name in CORE_TOOL_NAMES or tool.name in loaded_tools
+    ]
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Handle tool calls"""
     try:
-        client = get_api_client()
-
-        if name == "search_documents":
-            result = await handle_search_documents(client, arguments)
-        elif name == "get_document":
-            result = await handle_get_document(client, arguments)
-        elif name == "search_contact_accounts":
-            result = await handle_search_contact_accounts(client, arguments)
-        elif name == "get_contact_account":
-            result = await handle_get_contact_account(client, arguments)
-        elif name == "search_projects":
-            result = await handle_search_projects(client, arguments)
-        # Phase 2: Write operations
-        elif name == "create_purchase_invoice":
-            result = await handle_create_purchase_invoice(client, arguments)
-        elif name == "create_sale_invoice":
-            result = await handle_create_sale_invoice(client, arguments)
-        elif name == "update_document":
-            result = await handle_update_document(client, arguments)
-        # Phase 3: Additional read operations
-        elif name == "search_purchase_orders":
-            result = await handle_search_purchase_orders(client, arguments)
-        elif name == "get_purchase_order":
-            result = await handle_get_purchase_order(client, arguments)
-        elif name == "search_sale_orders":
-            result = await handle_search_sale_orders(client, arguments)
-        elif name == "get_sale_order":
-            result = await handle_get_sale_order(client, arguments)
-        elif name == "search_payments":
-            result = await handle_search_payments(client, arguments)
-        elif name == "search_products":
-            result = await handle_search_products(client, arguments)
-        elif name == "get_product":
-            result = await handle_get_product(client, arguments)
-
-        # Phase 4: Organizational hierarchy & workflows
-        elif name == "search_departments":
-            result = await handle_search_departments(client, arguments)
-        elif name == "get_department":
-            result = await handle_get_department(client, arguments)
-        elif name == "search_cost_centres":
-            result = await handle_search_cost_centres(client, arguments)
-        elif name == "get_cost_centre":
-            result = await handle_get_cost_centre(client, arguments)
-        elif name == "post_document":
-            result = await handle_post_document(client, arguments)
-        elif name == "approve_document":
-            result = await handle_approve_document(client, arguments)
-        elif name == "reverse_document":
-            result = await handle_reverse_document(client, arguments)
-        elif name == "search_batch_payments":
-            result = await handle_search_batch_payments(client, arguments)
-
-        else:
+        handler = TOOL_HANDLERS.get(name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {name}")
 
+        client = await get_api_client()
+        result = await handler(client, arguments)
+
         return [TextContent(type="text", text=result)]
 
     except Exception as e:
@@ -366,7 +741,8 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
 async def handle_search_documents(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_documents tool"""
-    input_data = SearchDocumentsInput(**args)
+    input_data = INPUT_ADAPTERS[SearchDocumentsInput].validate_python(args)
+    limit = input_data.limit
 
     # Build query parameters
     params = {}
@@ -383,7 +759,7 @@ async def handle_search_documents(client: IplicitAPIClient, args: dict) -> str:
         params["contactAccount"] = input_data.contact_account
 
     # Note: pageSize may or may not be supported, we'll try it
-    params["pageSize"] = min(input_data.limit, 100)
+    params["pageSize"] = min(limit, 100)
 
     # Make API request
     response = await client.make_request("document", params=params)
@@ -394,7 +770,7 @@ async def handle_search_documents(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_get_document(client: IplicitAPIClient, args: dict) -> str:
     """Handle get_document tool"""
-    input_data = GetDocumentInput(**args)
+    input_data = INPUT_ADAPTERS[GetDocumentInput].validate_python(args)
 
     # Get document by ID
     endpoint = f"document/{input_data.document_id}"
@@ -408,50 +784,40 @@ async def handle_get_document(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_search_contact_accounts(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_contact_accounts tool"""
-    input_data = SearchContactAccountsInput(**args)
+    input_data = INPUT_ADAPTERS[SearchContactAccountsInput].validate_python(args)
+    limit = input_data.limit
 
-    # Make API request
-    response = await client.make_request("contactaccount")
+    search_pattern = _search_pattern(input_data.search_term)
+    search = search_pattern.search if search_pattern else None
+    type_key = input_data.account_type if input_data.account_type != "all" else None
+    active_only = input_data.active_only
 
-    # Filter results based on criteria
-    if isinstance(response, dict) and "items" in response:
-        items = response["items"]
-    elif isinstance(response, list):
-        items = response
-    else:
-        items = [response]
-
-    # Filter by account type
-    if input_data.account_type != "all":
-        if input_data.account_type == "supplier":
-            items = [item for item in items if "supplier" in item]
-        elif input_data.account_type == "customer":
-            items = [item for item in items if "customer" in item]
-
-    # Filter by active status
-    if input_data.active_only:
-        filtered_items = []
-        for item in items:
-            is_active = True
+    def keep(item: dict) -> bool:
+        # Filter by account type
+        if type_key and type_key not in item:
+            return False
+
+        # Filter by active status
+        if active_only:
             if "supplier" in item:
-                is_active = item["supplier"].get("isActive", True)
+                if not item["supplier"].get("isActive", True):
+                    return False
             elif "customer" in item:
-                is_active = item["customer"].get("isActive", True)
-            if is_active:
-                filtered_items.append(item)
-        items = filtered_items
-
-    # Filter by search term
-    if input_data.search_term:
-        search_lower = input_data.search_term.lower()
-        items = [
-            item for item in items
-            if (search_lower in item.get("description", "").lower() or
-                search_lower in item.get("code", "").lower())
-        ]
-
-    # Apply limit
-    items = items[:input_data.limit]
+                if not item["customer"].get("isActive", True):
+                    return False
+
+        # Filter by search term
+        if search and not (search(item.get("description", "")) or search(item.get("code", ""))):
+            return False
+        return True
+
+    # Send the search and active filters to the API too when enabled
+    params = _api_filters(input_data.search_term, active_only) if SERVER_FILTERS else None
+
+    # Filter the full (cached) list, stopping as soon as enough matches are collected
+    response = await client.make_request("contactaccount", params=params)
+    items = response if isinstance(response, list) else response.get("items", [])
+    items = list(islice(filter(keep, items), limit))
 
     # Format response
     filtered_response = {"items": items, "totalCount": len(items)}
@@ -460,26 +826,11 @@ async def handle_search_contact_accounts(client: IplicitAPIClient, args: dict) -
 
 async def handle_get_contact_account(client: IplicitAPIClient, args: dict) -> str:
     """Handle get_contact_account tool"""
-    input_data = GetContactAccountInput(**args)
+    input_data = INPUT_ADAPTERS[GetContactAccountInput].validate_python(args)
 
-    # First, get all contact accounts
-    response = await client.make_request("contactaccount")
-
-    # Find the specific account
-    if isinstance(response, dict) and "items" in response:
-        items = response["items"]
-    elif isinstance(response, list):
-        items = response
-    else:
-        items = [response]
-
-    # Search by ID or code
-    account = None
-    for item in items:
-        if (item.get("id") == input_data.account_id or
-            item.get("code") == input_data.account_id):
-            account = item
-            break
+    # Look up by ID or code in the indexed list of all contact accounts
+    index = await client.get_id_code_index("contactaccount")
+    account = index.get(input_data.account_id)
 
     if not account:
         raise FileNotFoundError(
@@ -493,37 +844,38 @@ async def handle_get_contact_account(client: IplicitAPIClient, args: dict) -> st
 
 async def handle_search_projects(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_projects tool"""
-    input_data = SearchProjectsInput(**args)
+    input_data = INPUT_ADAPTERS[SearchProjectsInput].validate_python(args)
+    limit = input_data.limit
 
-    # Make API request
-    response = await client.make_request("project")
+    search_pattern = _search_pattern(input_data.search_term)
+    search = search_pattern.search if search_pattern else None
 
-    # Filter results
-    if isinstance(response, dict) and "items" in response:
-        items = response["items"]
-    elif isinstance(response, list):
-        items = response
-    else:
-        items = [response]
-
-    # Filter by search term
-    if input_data.search_term:
-        search_lower = input_data.search_term.lower()
-        items = [
-            item for item in items
-            if (search_lower in item.get("description", "").lower() or
-                search_lower in item.get("code", "").lower())
-        ]
-
-    # Filter by status
+    # Resolve the status filter once; unknown statuses are ignored
+    is_active = None
     if input_data.status:
         status_lower = input_data.status.lower()
         if status_lower in ["active", "inactive"]:
             is_active = status_lower == "active"
-            items = [item for item in items if item.get("isActive") == is_active]
 
-    # Apply limit
-    items = items[:input_data.limit]
+    def keep(item: dict) -> bool:
+        # Filter by search term
+        if search and not (search(item.get("description", "")) or search(item.get("code", ""))):
+            return False
+
+        # Filter by status
+        return is_active is None or item.get("isActive") == is_active
+
+    # Send the search and status filters to the API too when enabled
+    params = None
+    if SERVER_FILTERS:
+        params = _api_filters(input_data.search_term, False)
+        if is_active is not None:
+            params["isActive"] = "true" if is_active else "false"
+
+    # Filter the full (cached) list, stopping as soon as enough matches are collected
+    response = await client.make_request("project", params=params)
+    items = response if isinstance(response, list) else response.get("items", [])
+    items = list(islice(filter(keep, items), limit))
 
     # Format response
     filtered_response = {"items": items, "totalCount": len(items)}
@@ -533,34 +885,28 @@ async def handle_search_projects(client: IplicitAPIClient, args: dict) -> str:
 # ===== PHASE 2: WRITE OPERATION HANDLERS =====
 
 
+def _invoice_data(input_data: Any) -> dict:
+    """API body for a new invoice: camelCase names, optional fields only when non-empty"""
+    data = {}
+    for name, field in type(input_data).model_fields.items():
+        if name in INPUT_ONLY_FIELDS:
+            continue
+        value = getattr(input_data, name)
+        # Optional fields (default None) are sent only when set to a non-empty value
+        if value or field.default is not None:
+            data[field.serialization_alias or name] = value
+    if input_data.lines:
+        # Convert Pydantic models to dicts
+        data["lines"] = line_items_adapter.dump_python(input_data.lines)
+    return data
+
+
 async def handle_create_purchase_invoice(client: IplicitAPIClient, args: dict) -> str:
     """Handle create_purchase_invoice tool"""
-    input_data = CreatePurchaseInvoiceInput(**args)
+    input_data = INPUT_ADAPTERS[CreatePurchaseInvoiceInput].validate_python(args)
 
     # Convert input to dict for API client
-    data = {
-        "contactAccountId": input_data.contact_account_id,
-        "docDate": input_data.doc_date,
-        "dueDate": input_data.due_date,
-        "currency": input_data.currency,
-    }
-
-    # Optional fields
-    if input_data.doc_type_id:
-        data["docTypeId"] = input_data.doc_type_id
-    if input_data.legal_entity_id:
-        data["legalEntityId"] = input_data.legal_entity_id
-    if input_data.description:
-        data["description"] = input_data.description
-    if input_data.their_doc_no:
-        data["theirDocNo"] = input_data.their_doc_no
-    if input_data.payment_terms_id:
-        data["paymentTermsId"] = input_data.payment_terms_id
-    if input_data.project_id:
-        data["projectId"] = input_data.project_id
-    if input_data.lines:
-        # Convert Pydantic models to dicts
-        data["lines"] = [line.model_dump() for line in input_data.lines]
+    data = _invoice_data(input_data)
 
     # Create invoice via API client
     response = await client.create_purchase_invoice(data)
@@ -571,32 +917,10 @@ async def handle_create_purchase_invoice(client: IplicitAPIClient, args: dict) -
 
 async def handle_create_sale_invoice(client: IplicitAPIClient, args: dict) -> str:
     """Handle create_sale_invoice tool"""
-    input_data = CreateSaleInvoiceInput(**args)
+    input_data = INPUT_ADAPTERS[CreateSaleInvoiceInput].validate_python(args)
 
     # Convert input to dict for API client
-    data = {
-        "contactAccountId": input_data.contact_account_id,
-        "docDate": input_data.doc_date,
-        "dueDate": input_data.due_date,
-        "currency": input_data.currency,
-    }
-
-    # Optional fields
-    if input_data.doc_type_id:
-        data["docTypeId"] = input_data.doc_type_id
-    if input_data.legal_entity_id:
-        data["legalEntityId"] = input_data.legal_entity_id
-    if input_data.description:
-        data["description"] = input_data.description
-    if input_data.reference:
-        data["reference"] = input_data.reference
-    if input_data.payment_terms_id:
-        data["paymentTermsId"] = input_data.payment_terms_id
-    if input_data.project_id:
-        data["projectId"] = input_data.project_id
-    if input_data.lines:
-        # Convert Pydantic models to dicts
-        data["lines"] = [line.model_dump() for line in input_data.lines]
+    data = _invoice_data(input_data)
 
     # Create invoice via API client
     response = await client.create_sale_invoice(data)
@@ -607,26 +931,15 @@ async def handle_create_sale_invoice(client: IplicitAPIClient, args: dict) -> st
 
 async def handle_update_document(client: IplicitAPIClient, args: dict) -> str:
     """Handle update_document tool"""
-    input_data = UpdateDocumentInput(**args)
+    input_data = INPUT_ADAPTERS[UpdateDocumentInput].validate_python(args)
 
     # Build update data dict with only provided fields
-    data = {}
-
-    if input_data.description is not None:
-        data["description"] = input_data.description
-    if input_data.their_doc_no is not None:
-        data["theirDocNo"] = input_data.their_doc_no
-    if input_data.reference is not None:
-        data["reference"] = input_data.reference
-    if input_data.doc_date is not None:
-        data["docDate"] = input_data.doc_date
-    if input_data.due_date is not None:
-        data["dueDate"] = input_data.due_date
-    if input_data.contact_account_id is not None:
-        data["contactAccountId"] = input_data.contact_account_id
+    data = input_data.model_dump(
+        by_alias=True, exclude_none=True, exclude=INPUT_ONLY_FIELDS | {"document_id"}
+    )
     if input_data.lines is not None:
         # Convert Pydantic models to dicts
-        data["lines"] = [line.model_dump() for line in input_data.lines]
+        data["lines"] = line_items_adapter.dump_python(input_data.lines)
 
     # Update document via API client
     response = await client.update_document(input_data.document_id, data)
@@ -640,7 +953,7 @@ async def handle_update_document(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_search_purchase_orders(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_purchase_orders tool"""
-    input_data = SearchPurchaseOrdersInput(**args)
+    input_data = INPUT_ADAPTERS[SearchPurchaseOrdersInput].validate_python(args)
 
     # Build query parameters
     params = {}
@@ -652,37 +965,21 @@ async def handle_search_purchase_orders(client: IplicitAPIClient, args: dict) ->
         params["status"] = input_data.status
     if input_data.project_id:
         params["projectId"] = input_data.project_id
-
-    params["maxRecordCount"] = min(input_data.limit, 500)
-
-    # Make API request
-    response = await client.make_request("purchaseorder", params=params)
-
-    # Handle response format
-    items = response if isinstance(response, list) else response.get("items", [])
+    if SERVER_FILTERS and input_data.supplier:
+        params["contactAccount"] = input_data.supplier
 
     # Client-side filter by supplier if provided
-    if input_data.supplier:
-        filtered = []
-        for item in items:
-            supplier = item.get("contactAccountDescription", item.get("supplier", ""))
-            if input_data.supplier.lower() in supplier.lower():
-                filtered.append(item)
-        items = filtered
-
-    # Apply limit
-    items = items[:input_data.limit]
+    supplier_pattern = _search_pattern(input_data.supplier)
 
-    # Format response
-    if input_data.format == "json":
-        return format_response({"items": items, "totalCount": len(items)}, "json")
-    else:
-        return format_purchase_orders(items, len(items))
+    return await run_list_search(
+        client, "purchaseorder", params, input_data, format_purchase_orders,
+        _contact_filter(supplier_pattern, "supplier"),
+    )
 
 
 async def handle_get_purchase_order(client: IplicitAPIClient, args: dict) -> str:
     """Handle get_purchase_order tool"""
-    input_data = GetPurchaseOrderInput(**args)
+    input_data = INPUT_ADAPTERS[GetPurchaseOrderInput].validate_python(args)
 
     # Get purchase order by ID
     response = await client.make_request(f"purchaseorder/{input_data.order_id}")
@@ -696,7 +993,7 @@ async def handle_get_purchase_order(client: IplicitAPIClient, args: dict) -> str
 
 async def handle_search_sale_orders(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_sale_orders tool"""
-    input_data = SearchSaleOrdersInput(**args)
+    input_data = INPUT_ADAPTERS[SearchSaleOrdersInput].validate_python(args)
 
     # Build query parameters
     params = {}
@@ -708,37 +1005,21 @@ async def handle_search_sale_orders(client: IplicitAPIClient, args: dict) -> str
         params["status"] = input_data.status
     if input_data.project_id:
         params["projectId"] = input_data.project_id
-
-    params["maxRecordCount"] = min(input_data.limit, 500)
-
-    # Make API request
-    response = await client.make_request("saleorder", params=params)
-
-    # Handle response format
-    items = response if isinstance(response, list) else response.get("items", [])
+    if SERVER_FILTERS and input_data.customer:
+        params["contactAccount"] = input_data.customer
 
     # Client-side filter by customer if provided
-    if input_data.customer:
-        filtered = []
-        for item in items:
-            customer = item.get("contactAccountDescription", item.get("customer", ""))
-            if input_data.customer.lower() in customer.lower():
-                filtered.append(item)
-        items = filtered
+    customer_pattern = _search_pattern(input_data.customer)
 
-    # Apply limit
-    items = items[:input_data.limit]
-
-    # Format response
-    if input_data.format == "json":
-        return format_response({"items": items, "totalCount": len(items)}, "json")
-    else:
-        return format_sale_orders(items, len(items))
+    return await run_list_search(
+        client, "saleorder", params, input_data, format_sale_orders,
+        _contact_filter(customer_pattern, "customer"),
+    )
 
 
 async def handle_get_sale_order(client: IplicitAPIClient, args: dict) -> str:
     """Handle get_sale_order tool"""
-    input_data = GetSaleOrderInput(**args)
+    input_data = INPUT_ADAPTERS[GetSaleOrderInput].validate_python(args)
 
     # Get sale order by ID
     response = await client.make_request(f"saleorder/{input_data.order_id}")
@@ -752,7 +1033,7 @@ async def handle_get_sale_order(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_search_payments(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_payments tool"""
-    input_data = SearchPaymentsInput(**args)
+    input_data = INPUT_ADAPTERS[SearchPaymentsInput].validate_python(args)
 
     # Build query parameters
     params = {}
@@ -760,82 +1041,54 @@ async def handle_search_payments(client: IplicitAPIClient, args: dict) -> str:
         params["fromDate"] = input_data.from_date
     if input_data.to_date:
         params["toDate"] = input_data.to_date
-
-    params["maxRecordCount"] = min(input_data.limit, 500)
-
-    # Make API request
-    response = await client.make_request("payment", params=params)
-
-    # Handle response format
-    items = response if isinstance(response, list) else response.get("items", [])
-
-    # Client-side filters
-    if input_data.contact:
-        filtered = []
-        for item in items:
-            contact = item.get("contactAccountDescription", item.get("contact", ""))
-            if input_data.contact.lower() in contact.lower():
-                filtered.append(item)
-        items = filtered
-
-    if input_data.min_amount is not None:
-        items = [item for item in items if item.get("amount", 0) >= input_data.min_amount]
-
-    if input_data.max_amount is not None:
-        items = [item for item in items if item.get("amount", 0) <= input_data.max_amount]
-
-    # Apply limit
-    items = items[:input_data.limit]
-
-    # Format response
-    if input_data.format == "json":
-        return format_response({"items": items, "totalCount": len(items)}, "json")
-    else:
-        return format_payments(items, len(items))
+    if SERVER_FILTERS:
+        if input_data.contact:
+            params["contactAccount"] = input_data.contact
+        if input_data.min_amount is not None:
+            params["minAmount"] = input_data.min_amount
+        if input_data.max_amount is not None:
+            params["maxAmount"] = input_data.max_amount
+
+    # Client-side filters (contact and amount range), applied in a single pass
+    contact_pattern = _search_pattern(input_data.contact)
+    min_amount = input_data.min_amount
+    max_amount = input_data.max_amount
+
+    def payment_filter(item: dict) -> bool:
+        if contact_pattern and not contact_pattern.search(_contact_name(item, "contact")):
+            return False
+        amount = item.get("amount", 0)
+        if min_amount is not None and amount < min_amount:
+            return False
+        if max_amount is not None and amount > max_amount:
+            return False
+        return True
+
+    has_filter = contact_pattern or min_amount is not None or max_amount is not None
+
+    return await run_list_search(
+        client, "payment", params, input_data, format_payments,
+        payment_filter if has_filter else None,
+    )
 
 
 async def handle_search_products(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_products tool"""
-    input_data = SearchProductsInput(**args)
-
-    # Build query parameters
-    params = {"maxRecordCount": min(input_data.limit, 500)}
-
-    # Make API request
-    response = await client.make_request("product", params=params)
-
-    # Handle response format
-    items = response if isinstance(response, list) else response.get("items", [])
-
-    # Client-side filters
-    if input_data.search_term:
-        filtered = []
-        for item in items:
-            code = item.get("code", "").lower()
-            desc = item.get("description", item.get("name", "")).lower()
-            if input_data.search_term.lower() in code or input_data.search_term.lower() in desc:
-                filtered.append(item)
-        items = filtered
-
-    if input_data.active_only:
-        items = [item for item in items if item.get("isActive", True)]
+    input_data = INPUT_ADAPTERS[SearchProductsInput].validate_python(args)
+    active_only = input_data.active_only
+    product_type = input_data.product_type
 
-    if input_data.product_type:
-        items = [item for item in items if item.get("productType") == input_data.product_type]
-
-    # Apply limit
-    items = items[:input_data.limit]
-
-    # Format response
-    if input_data.format == "json":
-        return format_response({"items": items, "totalCount": len(items)}, "json")
-    else:
-        return format_products(items, len(items))
+    return await run_catalog_search(
+        client, "product", input_data, (active_only, product_type),
+        _product_filter(active_only, product_type),
+        _api_filters(input_data.search_term, active_only, product_type),
+        format_products,
+    )
 
 
 async def handle_get_product(client: IplicitAPIClient, args: dict) -> str:
     """Handle get_product tool"""
-    input_data = GetProductInput(**args)
+    input_data = INPUT_ADAPTERS[GetProductInput].validate_python(args)
 
     # Get product by ID
     response = await client.make_request(f"product/{input_data.product_id}")
@@ -852,53 +1105,29 @@ async def handle_get_product(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_search_departments(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_departments tool"""
-    input_data = SearchDepartmentsInput(**args)
-
-    params = {"maxRecordCount": min(input_data.limit, 500)}
-
-    response = await client.make_request("department", params=params)
-    items = response if isinstance(response, list) else response.get("items", [])
+    input_data = INPUT_ADAPTERS[SearchDepartmentsInput].validate_python(args)
+    active_only = input_data.active_only
 
-    # Client-side filter by search term
-    if input_data.search_term:
-        filtered = []
-        for item in items:
-            code = item.get("code", "").lower()
-            name = item.get("description", item.get("name", "")).lower()
-            if input_data.search_term.lower() in code or input_data.search_term.lower() in name:
-                filtered.append(item)
-        items = filtered
-
-    # Filter by active status
-    if input_data.active_only:
-        items = [item for item in items if item.get("active", True)]
-
-    items = items[:input_data.limit]
-
-    if input_data.format == "json":
-        return format_response({"items": items, "totalCount": len(items)}, "json")
-    else:
-        return format_departments(items, len(items))
+    return await run_catalog_search(
+        client, "department", input_data, (active_only,),
+        _active_filter if active_only else None,
+        _api_filters(input_data.search_term, active_only),
+        format_departments,
+    )
 
 
 async def handle_get_department(client: IplicitAPIClient, args: dict) -> str:
     """Handle get_department tool"""
-    input_data = GetDepartmentInput(**args)
+    input_data = INPUT_ADAPTERS[GetDepartmentInput].validate_python(args)
 
     # Try to get by ID first, then search by code if not a UUID
-    if len(input_data.department_id) == 36 and "-" in input_data.department_id:
+    if UUID_PATTERN.fullmatch(input_data.department_id):
         # Looks like a UUID
         dept = await client.make_request(f"department/{input_data.department_id}")
     else:
-        # Search by code
-        response = await client.make_request("department", params={"maxRecordCount": 100})
-        items = response if isinstance(response, list) else response.get("items", [])
-
-        dept = None
-        for item in items:
-            if item.get("code") == input_data.department_id:
-                dept = item
-                break
+        # Look up by code in the indexed list
+        index = await client.get_code_index("department", params=CATALOG_PARAMS)
+        dept = index.get(input_data.department_id)
 
         if not dept:
             return f"Department with code '{input_data.department_id}' not found."
@@ -911,53 +1140,29 @@ async def handle_get_department(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_search_cost_centres(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_cost_centres tool"""
-    input_data = SearchCostCentresInput(**args)
-
-    params = {"maxRecordCount": min(input_data.limit, 500)}
-
-    response = await client.make_request("costcentre", params=params)
-    items = response if isinstance(response, list) else response.get("items", [])
-
-    # Client-side filter by search term
-    if input_data.search_term:
-        filtered = []
-        for item in items:
-            code = item.get("code", "").lower()
-            name = item.get("description", item.get("name", "")).lower()
-            if input_data.search_term.lower() in code or input_data.search_term.lower() in name:
-                filtered.append(item)
-        items = filtered
+    input_data = INPUT_ADAPTERS[SearchCostCentresInput].validate_python(args)
+    active_only = input_data.active_only
 
-    # Filter by active status
-    if input_data.active_only:
-        items = [item for item in items if item.get("active", True)]
-
-    items = items[:input_data.limit]
-
-    if input_data.format == "json":
-        return format_response({"items": items, "totalCount": len(items)}, "json")
-    else:
-        return format_cost_centres(items, len(items))
+    return await run_catalog_search(
+        client, "costcentre", input_data, (active_only,),
+        _active_filter if active_only else None,
+        _api_filters(input_data.search_term, active_only),
+        format_cost_centres,
+    )
 
 
 async def handle_get_cost_centre(client: IplicitAPIClient, args: dict) -> str:
     """Handle get_cost_centre tool"""
-    input_data = GetCostCentreInput(**args)
+    input_data = INPUT_ADAPTERS[GetCostCentreInput].validate_python(args)
 
     # Try to get by ID first, then search by code if not a UUID
-    if len(input_data.cost_centre_id) == 36 and "-" in input_data.cost_centre_id:
+    if UUID_PATTERN.fullmatch(input_data.cost_centre_id):
         # Looks like a UUID
         cc = await client.make_request(f"costcentre/{input_data.cost_centre_id}")
     else:
-        # Search by code
-        response = await client.make_request("costcentre", params={"maxRecordCount": 100})
-        items = response if isinstance(response, list) else response.get("items", [])
-
-        cc = None
-        for item in items:
-            if item.get("code") == input_data.cost_centre_id:
-                cc = item
-                break
+        # Look up by code in the indexed list
+        index = await client.get_code_index("costcentre", params=CATALOG_PARAMS)
+        cc = index.get(input_data.cost_centre_id)
 
         if not cc:
             return f"Cost centre with code '{input_data.cost_centre_id}' not found."
@@ -970,7 +1175,7 @@ async def handle_get_cost_centre(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_post_document(client: IplicitAPIClient, args: dict) -> str:
     """Handle post_document tool"""
-    input_data = PostDocumentInput(**args)
+    input_data = INPUT_ADAPTERS[PostDocumentInput].validate_python(args)
 
     try:
         # Post the document
@@ -998,9 +1203,38 @@ async def handle_post_document(client: IplicitAPIClient, args: dict) -> str:
         return f"❌ Unexpected error posting document: {str(e)}"
 
 
+async def handle_post_documents(client: IplicitAPIClient, args: dict) -> str:
+    """Handle post_documents tool"""
+    input_data = INPUT_ADAPTERS[PostDocumentsInput].validate_python(args)
+
+    # The client posts each distinct ID once; repeats are reported as skipped
+    outcomes = await client.post_documents(input_data.document_ids, input_data.posting_date)
+
+    results = []
+    for document_id, outcome in outcomes.items():
+        if isinstance(outcome, FileNotFoundError):
+            results.append({"documentId": document_id, "error": "Document not found"})
+        elif isinstance(outcome, BaseException):
+            results.append({"documentId": document_id, "error": str(outcome)})
+        else:
+            results.append({"documentId": document_id, "document": outcome})
+
+    # Whatever is left after removing one of each posted ID is a repeat
+    remaining = list(input_data.document_ids)
+    for document_id in outcomes:
+        remaining.remove(document_id)
+    for document_id in remaining:
+        results.append({"documentId": document_id, "skipped": "Duplicate ID, posted once"})
+
+    if input_data.format == "json":
+        return format_response({"items": results, "totalCount": len(results)}, "json")
+    else:
+        return format_posted_documents(results)
+
+
 async def handle_approve_document(client: IplicitAPIClient, args: dict) -> str:
     """Handle approve_document tool"""
-    input_data = ApproveDocumentInput(**args)
+    input_data = INPUT_ADAPTERS[ApproveDocumentInput].validate_python(args)
 
     try:
         # Approve the document
@@ -1025,7 +1259,7 @@ async def handle_approve_document(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_reverse_document(client: IplicitAPIClient, args: dict) -> str:
     """Handle reverse_document tool"""
-    input_data = ReverseDocumentInput(**args)
+    input_data = INPUT_ADAPTERS[ReverseDocumentInput].validate_python(args)
 
     try:
         # Reverse the document
@@ -1054,7 +1288,7 @@ async def handle_reverse_document(client: IplicitAPIClient, args: dict) -> str:
 
 async def handle_search_batch_payments(client: IplicitAPIClient, args: dict) -> str:
     """Handle search_batch_payments tool"""
-    input_data = SearchBatchPaymentsInput(**args)
+    input_data = INPUT_ADAPTERS[SearchBatchPaymentsInput].validate_python(args)
 
     params = {}
     if input_data.from_date:
@@ -1063,27 +1297,96 @@ async def handle_search_batch_payments(client: IplicitAPIClient, args: dict) ->
         params["toDate"] = input_data.to_date
     if input_data.status:
         params["status"] = input_data.status
-    params["maxRecordCount"] = min(input_data.limit, 500)
-
-    response = await client.make_request("batchpayment", params=params)
-    items = response if isinstance(response, list) else response.get("items", [])
-
-    items = items[:input_data.limit]
 
-    if input_data.format == "json":
-        return format_response({"items": items, "totalCount": len(items)}, "json")
-    else:
-        return format_batch_payments(items, len(items))
+    return await run_list_search(client, "batchpayment", params, input_data, format_batch_payments)
+
+
+async def handle_discover_tools(client: IplicitAPIClient, args: dict) -> str:
+    """Handle discover_iplicit_tools tool"""
+    input_data = INPUT_ADAPTERS[DiscoverToolsInput].validate_python(args)
+
+    if input_data.load:
+        unknown = [name for name in input_data.load if name not in TOOLS_BY_NAME]
+        if unknown:
+            return f"❌ Unknown tool(s): {', '.join(unknown)}"
+
+        # Without lazy mode every tool is already listed, and the client was
+        # not told to expect tool list changes
+        newly_loaded = set(input_data.load) - CORE_TOOL_NAMES - loaded_tools
+        if LAZY_TOOLS and newly_loaded:
+            loaded_tools.update(newly_loaded)
+            # Ask the client to re-fetch the tool list
+            await app.request_context.session.send_tool_list_changed()
+
+    md = "## iplicit Tools\n\n"
+    md += "| Tool | Loaded | Description |\n"
+    md += "|------|--------|-------------|\n"
+    rows = []
+    for tool in TOOLS:
+        if tool.name in CORE_TOOL_NAMES:
+            continue
+        loaded = "✅" if tool.name in loaded_tools or not LAZY_TOOLS else "—"
+        summary = tool.description.split(". ")[0]
+        rows.append(f"| {tool.name} | {loaded} | {summary} |\n")
+    md += "".join(rows)
+
+    return md
+
+
+# Tool name -> handler, used by call_tool
+TOOL_HANDLERS = {
+    "search_documents": handle_search_documents,
+    "get_document": handle_get_document,
+    "search_contact_accounts": handle_search_contact_accounts,
+    "get_contact_account": handle_get_contact_account,
+    "search_projects": handle_search_projects,
+    # Phase 2: Write operations
+    "create_purchase_invoice": handle_create_purchase_invoice,
+    "create_sale_invoice": handle_create_sale_invoice,
+    "update_document": handle_update_document,
+    # Phase 3: Additional read operations
+    "search_purchase_orders": handle_search_purchase_orders,
+    "get_purchase_order": handle_get_purchase_order,
+    "search_sale_orders": handle_search_sale_orders,
+    "get_sale_order": handle_get_sale_order,
+    "search_payments": handle_search_payments,
+    "search_products": handle_search_products,
+    "get_product": handle_get_product,
+    # Phase 4: Organizational hierarchy & workflows
+    "search_departments": handle_search_departments,
+    "get_department": handle_get_department,
+    "search_cost_centres": handle_search_cost_centres,
+    "get_cost_centre": handle_get_cost_centre,
+    "post_document": handle_post_document,
+    "post_documents": handle_post_documents,
+    "approve_document": handle_approve_document,
+    "reverse_document": handle_reverse_document,
+    "search_batch_payments": handle_search_batch_payments,
+    "discover_iplicit_tools": handle_discover_tools,
+}
 
 
 def main():
     """Run the MCP server"""
-    import asyncio
     from mcp.server.stdio import stdio_server
 
     async def run():
-        async with stdio_server() as (read_stream, write_stream):
-            await app.run(read_stream, write_stream, app.create_initialization_options())
+        session_refresh = asyncio.create_task(keep_session_fresh())
+        prefetch = asyncio.create_task(prefetch_reference_data())
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await app.run(
+                    read_stream,
+                    write_stream,
+                    app.create_initialization_options(
+                        NotificationOptions(tools_changed=LAZY_TOOLS)
+                    ),
+                )
+        finally:
+            prefetch.cancel()
+            session_refresh.cancel()
+            if session_manager is not None:
+                await session_manager.close()
 
     asyncio.run(run())
 
@@ -8,10 +8,23 @@ Repository: https://github.com/qlickxl/iplicit_mcp_server
 """
 
 import os
+import time
 import asyncio
-from datetime import datetime, timedelta
+from importlib.util import find_spec
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 import httpx
+import orjson
+from .dates import parse_iso_datetime
+
+# Connection pool shared by session requests and all API requests
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+# Multiplex concurrent requests over one connection when h2 is installed
+HTTP2_ENABLED = find_spec("h2") is not None
+
+# Refresh tokens this many seconds before their actual expiry, for safety
+TOKEN_REFRESH_MARGIN = 300
 
 
 class IplicitSessionManager:
@@ -31,27 +44,45 @@ class IplicitSessionManager:
 
         self._session_token: Optional[str] = None
         self._token_expiry: Optional[datetime] = None
+        # time.monotonic() deadline for the next refresh, set with the token
+        self._refresh_at = 0.0
         self._lock = asyncio.Lock()
+        # Pooled HTTP client shared with IplicitAPIClient, created on first use
+        # and closed in close()
+        self._http: Optional[httpx.AsyncClient] = None
 
     async def get_valid_token(self) -> str:
         """Returns a valid session token, refreshing if needed"""
+        # Fast path: a fresh token needs no lock
+        if self._session_token and not self._is_token_expired():
+            return self._session_token
+
         async with self._lock:
-            # Check if we need a new token
+            # Check again, another task may have refreshed it while we waited
             if not self._session_token or self._is_token_expired():
                 await self._create_session()
 
             return self._session_token
 
+    def invalidate_token(self, token: str):
+        """Drop a token the API rejected, so the next call creates a new session"""
+        # Only the rejected token: a concurrent caller may already have renewed it
+        if self._session_token == token:
+            self._session_token = None
+
     def _is_token_expired(self) -> bool:
         """Check if the current token is expired or about to expire"""
-        if not self._token_expiry:
-            return True
+        return time.monotonic() >= self._refresh_at
 
-        # Refresh 5 minutes before actual expiry for safety
-        # Make sure both datetimes are timezone-aware
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        return now >= (self._token_expiry - timedelta(minutes=5))
+    def seconds_until_refresh(self) -> float:
+        """Seconds until the current token is due for refresh (0 if it already is)"""
+        return max(self._refresh_at - time.monotonic(), 0.0)
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        """Returns the shared pooled HTTP client, creating it on first use"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=30.0, limits=HTTP_LIMITS, http2=HTTP2_ENABLED)
+        return self._http
 
     async def _create_session(self):
         """Creates a new session with the API"""
@@ -65,34 +96,36 @@ class IplicitSessionManager:
             "userApiKey": self.api_key
         }
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-
-                data = response.json()
-                self._session_token = data.get("sessionToken")
-
-                # Parse token expiry
-                token_due = data.get("tokenDue")
-                if token_due:
-                    # Parse ISO format: 2025-11-04T16:45:13.183Z
-                    self._token_expiry = datetime.fromisoformat(
-                        token_due.replace("Z", "+00:00")
-                    )
-                else:
-                    # Default to 30 minutes if not provided
-                    self._token_expiry = datetime.utcnow() + timedelta(minutes=30)
-
-                if not self._session_token:
-                    raise ValueError("No session token received from API")
-
-            except httpx.HTTPStatusError as e:
-                raise ConnectionError(
-                    f"Failed to authenticate with iplicit API: {e.response.status_code} - {e.response.text}"
-                )
-            except Exception as e:
-                raise ConnectionError(f"Failed to create iplicit session: {str(e)}")
+        client = self.get_http_client()
+        try:
+            response = await client.post(url, headers=headers, json=payload)
+            response.raise_for_status()
+
+            data = orjson.loads(response.content)
+            self._session_token = data.get("sessionToken")
+
+            # Parse token expiry
+            token_due = data.get("tokenDue")
+            if token_due:
+                # Parse ISO format: 2025-11-04T16:45:13.183Z
+                self._token_expiry = parse_iso_datetime(token_due)
+            else:
+                # Default to 30 minutes if not provided
+                self._token_expiry = datetime.now(timezone.utc) + timedelta(minutes=30)
+
+            if not self._session_token:
+                raise ValueError("No session token received from API")
+
+            # Convert the wall-clock expiry to a monotonic refresh deadline once
+            remaining = (self._token_expiry - datetime.now(timezone.utc)).total_seconds()
+            self._refresh_at = time.monotonic() + remaining - TOKEN_REFRESH_MARGIN
+
+        except httpx.HTTPStatusError as e:
+            raise ConnectionError(
+                f"Failed to authenticate with iplicit API: {e.response.status_code} - {e.response.text}"
+            )
+        except Exception as e:
+            raise ConnectionError(f"Failed to create iplicit session: {str(e)}")
 
     def get_domain(self) -> str:
         """Returns the configured domain"""
@@ -101,4 +134,6 @@ class IplicitSessionManager:
     async def close(self):
         """Cleanup method for graceful shutdown"""
         # Could implement session termination if API supports it
-        pass
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -0,0 +1,293 @@
+"""
+iplicit MCP Server - API client tests
+
+Copyright (c) 2025 QlickXL Limited
+Licensed under MIT License - see LICENSE file for details
+
+Repository: https://github.com/qlickxl/iplicit_mcp_server
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.api_client import CACHE_TTLS, IplicitAPIClient
+from src.session import IplicitSessionManager
+
+
+class StubSessionManager:
+    """Session manager stand-in that never touches the network"""
+
+    async def get_valid_token(self) -> str:
+        return "token"
+
+    def get_domain(self) -> str:
+        return "test.domain"
+
+
+@pytest.mark.asyncio
+async def test_cancelling_first_caller_does_not_cancel_shared_get():
+    """A coalesced GET still completes for other callers when its starter is cancelled"""
+    client = IplicitAPIClient(StubSessionManager())
+    started = asyncio.Event()
+    release = asyncio.Event()
+    sent = []
+
+    async def fake_send(endpoint, method, params, body, headers):
+        sent.append(endpoint)
+        started.set()
+        await release.wait()
+        return {"items": [{"id": "po1"}]}
+
+    client._send_request = fake_send
+    params = {"status": "open", "maxRecordCount": 10}
+
+    first = asyncio.create_task(client.make_request("purchaseorder", params=params))
+    await started.wait()
+    second = asyncio.create_task(client.make_request("purchaseorder", params=params))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == {"items": [{"id": "po1"}]}
+    assert sent == ["purchaseorder"]
+    assert not client._inflight
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock for cache expiry, advanced by setting clock.now"""
+    fake = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr("src.api_client.time", SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+def caching_client() -> tuple:
+    """API client answering every request with a new response, recording what was sent"""
+    client = IplicitAPIClient(StubSessionManager())
+    sent = []
+
+    async def fake_send(endpoint, method, params, body, headers):
+        sent.append((method, endpoint))
+        return {"items": [{"id": f"{endpoint}-{len(sent)}"}]}
+
+    client._send_request = fake_send
+    return client, sent
+
+
+def cached(client) -> list:
+    """(endpoint, page) of each cached response, oldest first"""
+    return [(endpoint, dict(params).get("page")) for endpoint, params in client._cache]
+
+
+@pytest.mark.asyncio
+async def test_cached_responses_expire_after_their_ttl(clock):
+    client, sent = caching_client()
+
+    first = await client.make_request("contactaccount")
+    clock.now += CACHE_TTLS["contactaccount"] - 1
+    assert await client.make_request("contactaccount") is first
+    clock.now += 1
+    assert await client.make_request("contactaccount") is not first
+
+    # Endpoints without a TTL are always fetched
+    await client.make_request("document")
+    await client.make_request("document")
+    assert sent == [("GET", "contactaccount")] * 2 + [("GET", "document")] * 2
+
+
+@pytest.mark.asyncio
+async def test_full_cache_evicts_expired_then_oldest_entries(clock, monkeypatch):
+    monkeypatch.setattr("src.api_client.CACHE_MAX_ENTRIES", 3)
+    client, _ = caching_client()
+
+    await client.make_request("product", params={"page": 1})
+    await client.make_request("contactaccount", params={"page": 1})
+    await client.make_request("product", params={"page": 2})
+    await client.get_derived("contactaccount", {"page": 1}, "code", len)
+    await client.get_derived("product", {"page": 1}, "code", len)
+    await client.get_derived("product", {"page": 2}, "code", len)
+
+    # Past the contact TTL but not the product one: the expired entry goes before older ones
+    clock.now += CACHE_TTLS["contactaccount"] + 1
+    await client.make_request("product", params={"page": 3})
+    assert cached(client) == [("product", 1), ("product", 2), ("product", 3)]
+
+    # Nothing expired: the oldest entry goes
+    await client.make_request("product", params={"page": 4})
+    assert cached(client) == [("product", 2), ("product", 3), ("product", 4)]
+
+    # Structures built from evicted responses go with them
+    assert [dict(key[0][1])["page"] for key in client._derived] == [2]
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_their_endpoint_cache(clock):
+    client, sent = caching_client()
+
+    await client.make_request("product")
+    await client.make_request("contactaccount")
+    await client.get_derived("product", None, "code", len)
+
+    await client.make_request("product/P1", method="PUT", body={"description": "New"})
+    assert cached(client) == [("contactaccount", None)]
+    assert not client._derived
+
+    await client.make_request("product")
+    await client.make_request("contactaccount")
+    assert sent == [
+        ("GET", "product"),
+        ("GET", "contactaccount"),
+        ("PUT", "product/P1"),
+        ("GET", "product"),
+    ]
+
+
+def client_with_responses(responses: list) -> tuple:
+    """API client whose requests return the given responses in turn"""
+    client = IplicitAPIClient(StubSessionManager())
+    sent = []
+
+    async def fake_dispatch(method, url, headers, params, body):
+        sent.append(method)
+        return responses.pop(0)
+
+    client._dispatch = fake_dispatch
+    return client, sent
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry back-off waits instead of sleeping"""
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr("src.api_client.asyncio.sleep", fake_sleep)
+    return waits
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_without_retry_after_is_not_retried(sleeps):
+    client, sent = client_with_responses([httpx.Response(429)])
+
+    with pytest.raises(RuntimeError, match="rate limit"):
+        await client.make_request("document")
+    assert sent == ["GET"]
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_honours_short_retry_after(sleeps):
+    client, sent = client_with_responses([
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json={"items": []}),
+    ])
+
+    assert await client.make_request("document") == {"items": []}
+    assert sent == ["GET", "GET"]
+    assert sleeps == [2.0]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_with_long_retry_after_is_reported(sleeps):
+    client, sent = client_with_responses([httpx.Response(429, headers={"Retry-After": "120"})])
+
+    with pytest.raises(RuntimeError, match="rate limit"):
+        await client.make_request("document")
+    assert sent == ["GET"]
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried_for_get_only(sleeps):
+    client, sent = client_with_responses([
+        httpx.Response(502),
+        httpx.Response(200, json={"id": "doc1"}),
+    ])
+    assert await client.make_request("document/doc1") == {"id": "doc1"}
+    assert sent == ["GET", "GET"]
+
+    client, sent = client_with_responses([httpx.Response(502)])
+    with pytest.raises(RuntimeError, match="server error"):
+        await client.make_request("document/doc1/post", method="POST", body={})
+    assert sent == ["POST"]
+
+
+@pytest.fixture
+def session_manager(monkeypatch):
+    """Real session manager whose session requests hand out token-1, token-2, ..."""
+    monkeypatch.setenv("IPLICIT_API_KEY", "key")
+    monkeypatch.setenv("IPLICIT_USERNAME", "user")
+    monkeypatch.setenv("IPLICIT_DOMAIN", "test.domain")
+    manager = IplicitSessionManager()
+    manager.sessions = []
+
+    def create_session(request):
+        manager.sessions.append(request.url.path)
+        return httpx.Response(200, json={"sessionToken": f"token-{len(manager.sessions)}"})
+
+    manager._http = httpx.AsyncClient(transport=httpx.MockTransport(create_session))
+    return manager
+
+
+def client_with_auth_responses(session_manager, responses: list) -> tuple:
+    """API client sending the given responses in turn, recording each request's token"""
+    client = IplicitAPIClient(session_manager)
+    tokens = []
+
+    async def fake_dispatch(method, url, headers, params, body):
+        tokens.append(headers["Authorization"])
+        response = responses.pop(0)
+        return await response() if callable(response) else response
+
+    client._dispatch = fake_dispatch
+    return client, tokens
+
+
+@pytest.mark.asyncio
+async def test_rejected_token_is_renewed_once(session_manager):
+    client, tokens = client_with_auth_responses(session_manager, [
+        httpx.Response(401),
+        httpx.Response(200, json={"id": "doc1"}),
+    ])
+
+    assert await client.make_request("document/doc1") == {"id": "doc1"}
+    assert tokens == ["Bearer token-1", "Bearer token-2"]
+    assert len(session_manager.sessions) == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_renewed_token_raises_permission_error(session_manager):
+    client, tokens = client_with_auth_responses(session_manager, [httpx.Response(401), httpx.Response(401)])
+
+    with pytest.raises(PermissionError):
+        await client.make_request("document/doc1")
+    assert tokens == ["Bearer token-1", "Bearer token-2"]
+    assert len(session_manager.sessions) == 2
+
+
+@pytest.mark.asyncio
+async def test_token_renewed_by_another_caller_is_kept(session_manager):
+    """A 401 for an old token does not discard the session another request already renewed"""
+
+    async def renewed_elsewhere():
+        session_manager.invalidate_token("token-1")
+        await session_manager.get_valid_token()
+        return httpx.Response(401)
+
+    client, tokens = client_with_auth_responses(session_manager, [
+        renewed_elsewhere,
+        httpx.Response(200, json={"id": "doc1"}),
+    ])
+
+    assert await client.make_request("document/doc1") == {"id": "doc1"}
+    assert tokens == ["Bearer token-1", "Bearer token-2"]
+    assert len(session_manager.sessions) == 2
+    assert await session_manager.get_valid_token() == "token-2"
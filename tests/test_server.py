@@ -0,0 +1,202 @@
+"""
+iplicit MCP Server - Server handler tests
+
+Copyright (c) 2025 QlickXL Limited
+Licensed under MIT License - see LICENSE file for details
+
+Repository: https://github.com/qlickxl/iplicit_mcp_server
+"""
+
+import orjson
+import pytest
+
+from src.api_client import IplicitAPIClient
+from src.models import CreatePurchaseInvoiceInput, CreateSaleInvoiceInput
+import src.server
+from src.server import (
+    CATALOG_PARAMS,
+    _build_search_index,
+    _find_in_search_text,
+    _invoice_data,
+    handle_discover_tools,
+    handle_post_documents,
+    handle_search_payments,
+    handle_search_purchase_orders,
+    search_catalog,
+)
+from tests.test_api_client import StubSessionManager
+
+
+class StubClient:
+    """API client stand-in returning fixed list responses"""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+
+    async def make_request(self, endpoint, method="GET", params=None, body=None, headers=None):
+        return self.responses[endpoint]
+
+
+def test_invoice_data_omits_empty_optional_fields():
+    """Empty optional strings are left out of new invoice bodies, required fields are kept"""
+    for model in (CreatePurchaseInvoiceInput, CreateSaleInvoiceInput):
+        input_data = model.model_validate({
+            "contact_account_id": "C001",
+            "doc_date": "2025-01-01",
+            "due_date": "2025-02-01",
+            "description": "",
+            "project_id": "",
+            "payment_terms_id": "",
+            "legal_entity_id": "le1",
+        })
+
+        assert _invoice_data(input_data) == {
+            "contactAccountId": "C001",
+            "docDate": "2025-01-01",
+            "dueDate": "2025-02-01",
+            "currency": "GBP",
+            "legalEntityId": "le1",
+        }
+
+
+@pytest.mark.asyncio
+async def test_contact_filters_fall_back_per_item():
+    """Items without contactAccountDescription still match on the fallback field"""
+    client = StubClient({
+        "purchaseorder": {"items": [
+            {"id": "PO1", "contactAccountDescription": "Acme Ltd"},
+            {"id": "PO2", "contactAccountDescription": "Other plc"},
+            {"id": "PO3", "supplier": "Acme X"},
+        ]},
+        "payment": {"items": [
+            {"id": "P1", "contactAccountDescription": "Acme Ltd", "amount": 10},
+            {"id": "P2", "contact": "ACME Y", "amount": 20},
+        ]},
+    })
+
+    result = await handle_search_purchase_orders(client, {"supplier": "acme", "format": "json"})
+    assert [item["id"] for item in orjson.loads(result)["items"]] == ["PO1", "PO3"]
+
+    result = await handle_search_payments(client, {"contact": "acme", "format": "json"})
+    assert [item["id"] for item in orjson.loads(result)["items"]] == ["P1", "P2"]
+
+
+CATALOG = [
+    {"code": "WID-1", "description": "Widget", "active": True},
+    {"code": "GAD-1", "description": "Gadget widget", "active": False},
+    {"code": None, "description": "Widgetry kit", "active": True},
+    {"code": "WIDGET-9"},
+    {"code": "BOLT", "name": "Wide bolt", "active": True},
+]
+
+
+def catalog_client(items: list) -> IplicitAPIClient:
+    """API client serving a fixed catalog without touching the network"""
+    client = IplicitAPIClient(StubSessionManager())
+
+    async def fake_send(endpoint, method, params, body, headers):
+        return {"items": items}
+
+    client._send_request = fake_send
+    return client
+
+
+def search(items: list, term: str) -> list:
+    """Indices of the items the search index finds for a lowercased term"""
+    _, text, starts = _build_search_index(items)
+    return _find_in_search_text(text, starts, term)
+
+
+def test_search_index_finds_hit_in_last_item():
+    assert search(CATALOG, "bolt") == [4]
+    assert search(CATALOG, "wide b") == [4]
+
+
+def test_search_index_reports_code_and_description_match_once():
+    assert search(CATALOG, "wid") == [0, 1, 2, 3, 4]
+    assert search([{"code": "ABC", "description": "abc"}], "abc") == [0]
+
+
+def test_search_index_handles_missing_code_and_description():
+    items = [{"code": None}, {"description": None}, {}, {"code": "x1"}]
+    keys, _, _ = _build_search_index(items)
+
+    assert [key[:2] for key in keys] == [("", ""), ("", ""), ("", ""), ("x1", "")]
+    assert search(items, "x1") == [3]
+    assert search(items, "y") == []
+
+
+@pytest.mark.asyncio
+async def test_search_memo_extension_matches_cold_scan():
+    """Narrowing a remembered term gives the same results as a fresh scan"""
+    is_active = lambda item: item.get("active") is True
+    warm = catalog_client(CATALOG)
+    cold = catalog_client(CATALOG)
+
+    for predicate, filters in ((None, ()), (is_active, (True,))):
+        await search_catalog(warm, "product", "wid", filters, predicate)
+        memo = await warm.get_derived("product", CATALOG_PARAMS, "results", dict)
+        assert ("wid", filters) in memo
+        assert ("widg", filters) not in memo
+
+        extended = await search_catalog(warm, "product", "widg", filters, predicate)
+        assert extended == await search_catalog(cold, "product", "widg", filters, predicate)
+        assert [item["code"] for item in extended] == (
+            ["WID-1", None] if predicate else ["WID-1", "GAD-1", None, "WIDGET-9"]
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_memo_keeps_filters_apart():
+    """Results remembered for one set of filters are not reused for another"""
+    client = catalog_client(CATALOG)
+    is_active = lambda item: item.get("active") is True
+    is_inactive = lambda item: item.get("active") is False
+
+    active = await search_catalog(client, "product", "wid", (True,), is_active)
+    inactive = await search_catalog(client, "product", "widg", (False,), is_inactive)
+    unfiltered = await search_catalog(client, "product", "widg", (), None)
+
+    assert [item["code"] for item in active] == ["WID-1", None, "BOLT"]
+    assert [item["code"] for item in inactive] == ["GAD-1"]
+    assert [item["code"] for item in unfiltered] == ["WID-1", "GAD-1", None, "WIDGET-9"]
+
+
+@pytest.mark.asyncio
+async def test_post_documents_posts_repeated_ids_once():
+    client = IplicitAPIClient(StubSessionManager())
+    posted = []
+
+    async def fake_post(document_id, posting_date=None):
+        posted.append(document_id)
+        if document_id == "missing":
+            raise FileNotFoundError(document_id)
+        return {"id": document_id}
+
+    client.post_document = fake_post
+    result = await handle_post_documents(client, {
+        "document_ids": ["D1", "missing", "D1", "D2", "D1"],
+        "format": "json",
+    })
+
+    assert sorted(posted) == ["D1", "D2", "missing"]
+    assert orjson.loads(result)["items"] == [
+        {"documentId": "D1", "document": {"id": "D1"}},
+        {"documentId": "missing", "error": "Document not found"},
+        {"documentId": "D2", "document": {"id": "D2"}},
+        {"documentId": "D1", "skipped": "Duplicate ID, posted once"},
+        {"documentId": "D1", "skipped": "Duplicate ID, posted once"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_discover_tools_only_notifies_in_lazy_mode(monkeypatch):
+    """Loading tools outside lazy mode changes nothing and sends no notification"""
+    monkeypatch.setattr(src.server, "LAZY_TOOLS", False)
+    monkeypatch.setattr(src.server, "loaded_tools", set())
+
+    # Outside a request, sending a notification would raise LookupError
+    result = await handle_discover_tools(None, {"load": ["create_purchase_invoice"]})
+
+    assert "| create_purchase_invoice | ✅ |" in result
+    assert src.server.loaded_tools == set()